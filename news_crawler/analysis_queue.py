@@ -0,0 +1,203 @@
+"""
+LLM 분석 우선순위 큐
+Gemini 할당량/실행 시간보다 새 기사가 많을 때, 피드 순서가 아니라 중요도 순으로 분석
+- 점수 = 소스 등급 + 최신성 + 시장 키워드
+- 실행당 토큰(또는 비용) 예산 안에서 높은 점수부터 분석
+- 수집 중에는 후보를 크기 제한 heap(CandidateHeap)에 모으고, 수집이 끝난 뒤 예산을 한 번에 배분
+  (먼저 도착한 피드가 예산을 먼저 쓰지 않도록 실행 전체 기준 우선순위 유지)
+- 예산을 넘는 기사는 버리지 않고 다음 실행으로 이월 (analysis_queue 상태)
+  MAX_CARRY_HOURS가 지났거나 MAX_QUEUE_SIZE를 넘는 기사는 호출 측(main)이 fallback 문서로 저장
+"""
+
+import os
+import math
+import heapq
+import logging
+from datetime import datetime
+
+import pytz
+from dateutil import parser as date_parser
+
+import text_clean
+from crawler_state import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = "analysis_queue"
+
+# 실행당 예산. LLM_COST_BUDGET(USD)이 설정되면 토큰 예산과 비교해 더 작은 쪽 적용
+TOKEN_BUDGET = int(os.environ.get('LLM_TOKEN_BUDGET', '40000'))
+COST_BUDGET = float(os.environ.get('LLM_COST_BUDGET', '0') or 0)
+PRICE_PER_1K_TOKENS = float(os.environ.get('LLM_PRICE_PER_1K_TOKENS', '0.0003'))
+
+# 토큰 추정치 (본문/제목은 text_clean.estimate_tokens)
+OUTPUT_TOKENS_PER_ITEM = 250
+PROMPT_TOKENS_PER_ITEM = 60  # 배치 프롬프트 지시문을 항목 수로 나눈 몫
+
+# 이월 한도
+MAX_CARRY_HOURS = 48
+MAX_QUEUE_SIZE = 500
+
+# 소스 등급 (0~1). 시장 영향이 큰 매체일수록 높음
+SOURCE_TIERS = {
+    "WSJ_Markets": 1.0,
+    "Reuters_Business": 0.9,
+    "CNBC_Economy": 0.8,
+    "MarketWatch": 0.8,
+    "Investing_News": 0.7,
+    "Google_US_Economy": 0.6,
+    "Google_Global_Markets": 0.6,
+    "Google_Korea_Economy": 0.6,
+    "CoinDesk": 0.5,
+    "CNBC_Tech": 0.4,
+    "TechCrunch": 0.3,
+}
+DEFAULT_TIER = 0.5
+
+# 시장 영향 키워드 (소문자 부분 일치)
+KEYWORD_WEIGHTS = {
+    "fed": 1.0, "fomc": 1.5, "powell": 1.0, "rate cut": 1.5, "rate hike": 1.5, "interest rate": 1.0,
+    "inflation": 1.0, "cpi": 1.2, "pce": 1.0, "jobs report": 1.2, "payrolls": 1.2, "gdp": 1.0,
+    "recession": 1.0, "earnings": 0.8, "guidance": 0.6, "tariff": 1.0, "treasury": 0.8, "yield": 0.6,
+    "oil": 0.5, "dollar": 0.5, "bitcoin": 0.4, "default": 0.8, "bankruptcy": 0.8, "merger": 0.6,
+    "금리": 1.5, "연준": 1.5, "물가": 1.0, "환율": 1.0, "기준금리": 1.5, "코스피": 0.8, "실적": 0.6, "관세": 1.0,
+}
+MAX_KEYWORD_SCORE = 3.0
+
+RECENCY_HALF_LIFE_HOURS = 6
+
+# 이월 시 유지할 필드 (본문 등 큰 필드는 제외, article_cache에 따로 있음)
+CARRY_FIELDS = ("id", "title", "link", "published", "source", "full_content", "legacy_ids", "wrapper_link", "queued_at")
+
+def _age_hours(art, now):
+    try:
+        published = date_parser.parse(art['published'])
+        if published.tzinfo is None:
+            published = pytz.utc.localize(published)
+        return max(0.0, (now - published).total_seconds() / 3600)
+    except Exception:
+        return None
+
+def score_article(art, now=None):
+    """우선순위 점수 (높을수록 먼저 분석)"""
+    now = now or datetime.now(pytz.utc)
+    tier = SOURCE_TIERS.get(art.get('source'), DEFAULT_TIER)
+
+    age = _age_hours(art, now)
+    recency = 0.5 if age is None else math.pow(0.5, age / RECENCY_HALF_LIFE_HOURS)
+
+    text = f"{art.get('title', '')} {art.get('full_content', '')[:300]}".lower()
+    keywords = min(MAX_KEYWORD_SCORE, sum(w for kw, w in KEYWORD_WEIGHTS.items() if kw in text))
+
+    return 4 * tier + 3 * recency + keywords
+
+def estimate_tokens(art, body_tokens=0):
+    """기사 1건 분석에 드는 토큰 추정치 (입력 + 출력). 본문은 기사 본문, 없으면 RSS description"""
+    body = art.get('article_text') or art.get('full_content') or ''
+    tokens = text_clean.estimate_tokens(art.get('title', '')) + min(text_clean.estimate_tokens(body), body_tokens)
+    return tokens + PROMPT_TOKENS_PER_ITEM + OUTPUT_TOKENS_PER_ITEM
+
+def run_budget():
+    """이번 실행의 토큰 예산"""
+    budget = TOKEN_BUDGET
+    if COST_BUDGET > 0 and PRICE_PER_1K_TOKENS > 0:
+        budget = min(budget, int(COST_BUDGET / PRICE_PER_1K_TOKENS * 1000))
+    return budget
+
+def load_carried():
+    """
+    지난 실행에서 이월된 기사
+
+    Returns:
+        (이월 기사 목록, MAX_CARRY_HOURS가 지나 더 이월하지 않을 기사 목록)
+    """
+    now = datetime.now(pytz.utc)
+    carried, expired = [], []
+    for art in load_state(QUEUE_NAME, [], worker=True):
+        age = _age_hours(art, now)
+        if age is not None and age > MAX_CARRY_HOURS:
+            expired.append(art)
+        else:
+            carried.append(art)
+    return carried, expired
+
+class CandidateHeap:
+    """
+    분석 후보를 점수 순으로 모으는 크기 제한 heap (최소 heap, 넘치면 가장 낮은 점수부터 밀려남)
+
+    사용:
+        heap = CandidateHeap()
+        heap.push(art)            # 수집 중
+        heap.drain()              # 수집 후, 점수 높은 순
+        heap.overflow             # 밀려난 기사 (다음 실행으로 이월)
+    """
+
+    def __init__(self, capacity=MAX_QUEUE_SIZE):
+        self.capacity = capacity
+        self.heap = []
+        self.overflow = []
+        self.count = 0
+        self.now = datetime.now(pytz.utc)
+
+    def push(self, art):
+        entry = (score_article(art, self.now), self.count, art)
+        self.count += 1
+        if len(self.heap) < self.capacity:
+            heapq.heappush(self.heap, entry)
+        else:
+            self.overflow.append(heapq.heappushpop(self.heap, entry)[2])
+
+    def __len__(self):
+        return len(self.heap)
+
+    def drain(self):
+        arts = [art for _, _, art in sorted(self.heap, reverse=True)]
+        self.heap = []
+        return arts
+
+def plan_analysis(candidates, budget, body_tokens=0):
+    """
+    예산 안에서 분석할 기사 선택
+
+    Returns:
+        (분석할 기사 목록 - 우선순위 순, 이월할 기사 목록)
+    """
+    now = datetime.now(pytz.utc)
+    heap = [(-score_article(art, now), i, art) for i, art in enumerate(candidates)]
+    heapq.heapify(heap)
+
+    selected, deferred = [], []
+    spent = 0
+    while heap:
+        _, _, art = heapq.heappop(heap)
+        cost = estimate_tokens(art, body_tokens)
+        if spent + cost <= budget:
+            selected.append(art)
+            spent += cost
+        else:
+            deferred.append(art)
+
+    if deferred:
+        logger.info(f"🎯 Priority queue: analysing {len(selected)} (~{spent} tokens), deferring {len(deferred)} to next run")
+    return selected, deferred
+
+def split_carry(deferred):
+    """
+    이월할 기사와 큐에 들어가지 못하는 기사로 나눔 (deferred는 우선순위 순)
+
+    Returns:
+        (이월할 기사 목록, MAX_QUEUE_SIZE를 넘는 낮은 우선순위 기사 목록)
+    """
+    if len(deferred) > MAX_QUEUE_SIZE:
+        logger.warning(f"Analysis queue full, {len(deferred) - MAX_QUEUE_SIZE} lowest-priority items will be saved without analysis")
+    return deferred[:MAX_QUEUE_SIZE], deferred[MAX_QUEUE_SIZE:]
+
+def save_carried(deferred):
+    """이월 기사 저장 (우선순위 순서 유지, split_carry로 MAX_QUEUE_SIZE 이내로 자른 목록)"""
+    now_iso = datetime.now(pytz.utc).isoformat()
+    queue = []
+    for art in deferred:
+        item = {k: art[k] for k in CARRY_FIELDS if k in art}
+        item.setdefault('queued_at', now_iso)
+        queue.append(item)
+    save_state(QUEUE_NAME, queue, worker=True)
@@ -0,0 +1,242 @@
+"""
+기사 본문 수집기 (선택적 enrichment 단계)
+RSS에는 제목과 짧은 description만 있으므로, 링크된 기사 페이지를 병렬로 받아 본문을 추출
+- 호스트별 동시 요청 수 / 요청 간격 제한 (politeness)
+- robots.txt 준수
+- readability 방식의 경량 본문 추출 (문단 텍스트 밀도 기반)
+- URL 기준 디스크 캐시 (TTL) -> 매 실행마다 같은 페이지를 다시 받지 않음
+  임시 파일에 쓴 뒤 교체(중단돼도 깨진 항목이 남지 않음), 실행마다 한 번 TTL이 지난 항목 삭제 + 전체 크기 제한
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+from bs4 import BeautifulSoup
+
+import host_health
+from crawler_state import state_dir
+
+logger = logging.getLogger(__name__)
+
+# 환경변수 ARTICLE_FETCH=1 일 때만 main()에서 실행
+ENABLED = os.environ.get('ARTICLE_FETCH', '0') == '1'
+
+MAX_WORKERS = 8
+PER_HOST_CONCURRENCY = 2
+PER_HOST_DELAY = 1.0       # 같은 호스트 요청 간 최소 간격 (초)
+CACHE_TTL = 7 * 24 * 3600  # 기사 본문은 거의 바뀌지 않으므로 1주일
+FAILURE_TTL = 6 * 3600     # 실패/차단 결과는 짧게 캐시
+MAX_CHARS = 4000
+MAX_CACHE_BYTES = 100 * 1024 * 1024
+TIMEOUT = 10
+
+USER_AGENT = 'Mozilla/5.0 (compatible; MakeNewsBot/1.0)'
+
+# 래퍼 링크만 주는 호스트 (본문 추출 불가)
+SKIP_HOSTS = {"news.google.com"}
+
+# 본문과 무관한 태그
+NOISE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "figure", "iframe", "svg"]
+
+_host_locks = {}
+_host_last = {}
+_robots = {}
+_registry_lock = threading.Lock()
+_pruned = False
+
+def _cache_file(url):
+    return os.path.join(state_dir("article_cache"), hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+def _cache_get(url):
+    path = _cache_file(url)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        ttl = CACHE_TTL if entry.get('text') else FAILURE_TTL
+        if time.time() - entry.get('fetched_at', 0) < ttl:
+            return entry
+    except Exception:
+        pass
+    return None
+
+def _cache_put(url, text):
+    path = _cache_file(url)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"url": url, "fetched_at": time.time(), "text": text}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Article cache write failed: {e}")
+
+def prune_cache():
+    """
+    TTL(CACHE_TTL)이 지난 항목과 중단된 실행이 남긴 임시 파일 삭제,
+    남은 크기가 MAX_CACHE_BYTES를 넘으면 오래된 항목부터 삭제
+
+    Returns:
+        삭제한 파일 수
+    """
+    now = time.time()
+    entries = []
+    total = removed = 0
+    for e in os.scandir(state_dir("article_cache")):
+        try:
+            st = e.stat()
+        except OSError:
+            continue
+        if now - st.st_mtime > (3600 if e.name.endswith(".tmp") else CACHE_TTL):
+            try:
+                os.remove(e.path)
+                removed += 1
+            except OSError:
+                pass
+            continue
+        entries.append((st.st_mtime, st.st_size, e.path))
+        total += st.st_size
+    if total > MAX_CACHE_BYTES:
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+            total -= size
+            if total <= MAX_CACHE_BYTES * 0.8:
+                break
+    if removed:
+        logger.info(f"📄 Article cache: removed {removed} expired entries")
+    return removed
+
+def _host_slot(host):
+    with _registry_lock:
+        if host not in _host_locks:
+            _host_locks[host] = threading.BoundedSemaphore(PER_HOST_CONCURRENCY)
+        return _host_locks[host]
+
+def _wait_politely(host):
+    """같은 호스트에 PER_HOST_DELAY 간격을 두고 요청"""
+    with _registry_lock:
+        now = time.time()
+        start = max(now, _host_last.get(host, 0) + PER_HOST_DELAY)
+        _host_last[host] = start
+    if start > now:
+        time.sleep(start - now)
+
+def _allowed(url):
+    """robots.txt 확인 (호스트별 1회 조회, 조회 실패 시 허용)"""
+    parsed = urlparse(url)
+    base = f"{parsed.scheme}://{parsed.netloc}"
+    with _registry_lock:
+        rp = _robots.get(base)
+    if rp is None:
+        rp = RobotFileParser()
+        try:
+            resp = requests.get(f"{base}/robots.txt", headers={'User-Agent': USER_AGENT}, timeout=TIMEOUT)
+            if resp.status_code in (401, 403):
+                rp.disallow_all = True
+            elif resp.status_code == 200:
+                rp.parse(resp.text.splitlines())
+            else:
+                rp.allow_all = True
+        except Exception:
+            rp.allow_all = True
+        with _registry_lock:
+            _robots[base] = rp
+    return rp.can_fetch(USER_AGENT, url)
+
+def extract_main_text(html):
+    """
+    readability 방식 본문 추출
+    <p> 텍스트를 부모 요소별로 모아 점수화 (텍스트 길이 + 쉼표 수, 링크 비율이 높으면 감점)
+    가장 높은 점수의 부모 요소의 문단들을 본문으로 사용
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+
+    root = soup.find('article') or soup.body or soup
+    scores = {}
+    paragraphs = {}
+    for p in root.find_all('p'):
+        text = p.get_text(" ", strip=True)
+        if len(text) < 40:
+            continue
+        link_len = sum(len(a.get_text(strip=True)) for a in p.find_all('a'))
+        if link_len > len(text) * 0.5:
+            continue
+        parent = p.parent
+        key = id(parent)
+        scores[key] = scores.get(key, 0) + len(text) / 100 + text.count(',') + 1
+        paragraphs.setdefault(key, []).append(text)
+
+    if not scores:
+        return ""
+    best = max(scores, key=scores.get)
+    return "\n\n".join(paragraphs[best])[:MAX_CHARS]
+
+def fetch_article_text(url):
+    """단일 URL 본문 (캐시 우선). 실패/차단 시 빈 문자열"""
+    cached = _cache_get(url)
+    if cached is not None:
+        return cached['text']
+
+    host = urlparse(url).netloc
+    if not host or host in SKIP_HOSTS or host_health.is_open(url):
+        return ""
+
+    text = ""
+    try:
+        if _allowed(url):
+            with _host_slot(host):
+                _wait_politely(host)
+                try:
+                    resp = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=TIMEOUT)
+                except requests.RequestException as e:
+                    host_health.record(url, error=e)
+                    raise
+                host_health.record(url, status=resp.status_code)
+            if resp.status_code == 200 and 'html' in resp.headers.get('Content-Type', 'text/html'):
+                text = extract_main_text(resp.content)
+            else:
+                logger.debug(f"Article fetch HTTP {resp.status_code}: {url}")
+        else:
+            logger.info(f"robots.txt disallows: {url}")
+    except Exception as e:
+        logger.warning(f"Article fetch failed {host}: {e}")
+
+    _cache_put(url, text)
+    return text
+
+def enrich_articles(articles, max_workers=MAX_WORKERS):
+    """
+    기사 목록에 'article_text' 필드 추가 (병렬 수집)
+
+    Returns:
+        본문을 얻은 기사 수
+    """
+    global _pruned
+    if not articles:
+        return 0
+    if not _pruned:
+        # 실행당 한 번 (enrich는 피드 청크마다 호출됨)
+        _pruned = True
+        prune_cache()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        texts = list(pool.map(lambda art: fetch_article_text(art['link']), articles))
+    for art, text in zip(articles, texts):
+        art['article_text'] = text
+    found = sum(1 for t in texts if t)
+    logger.info(f"📄 Article bodies: {found}/{len(articles)} extracted")
+    return found
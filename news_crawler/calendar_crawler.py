@@ -1,12 +1,12 @@
 
 import os
 import logging
-import requests
 import datetime
 import firebase_admin
 from firebase_admin import credentials, firestore
 from bs4 import BeautifulSoup
 import time
+import http_cache
 
 # Configure logging
 logging.basicConfig(
@@ -43,7 +43,7 @@ def fetch_economic_calendar():
             "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7"
         }
 
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_cache.get(url, kind="calendar", headers=headers, timeout=10)
         
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -0,0 +1,300 @@
+"""
+경제 캘린더 발표 시각 감시 (release-window fast poller)
+economic_calendar의 `actual` 값은 발표 직후가 가장 중요하지만, 15분 주기 전체 수집으로는 최대 15분 늦게 반영됨
+발표 예정 시각이 임박한 이벤트만 골라 짧은 간격으로 확인하고, data-actual이 채워진 이벤트 문서만 갱신
+
+- 일정(이벤트 ID, TradingEconomics data-id, 예정 시각)은 로컬 상태(calendar_schedule)에 저장, 1시간마다 갱신
+- 감시 대상 행만 파싱 (SoupStrainer) -> 전체 행을 다시 파싱/저장하지 않음
+- 이번 실행 구간에 발표 예정 이벤트가 없으면 Firestore 연결 없이 바로 종료
+- 예정 시각 전후(FAST_POLL_WINDOW)에만 POLL_SECONDS 간격, 그 밖에는 SLOW_POLL_SECONDS 간격으로 확인
+- 문서 ID는 main.py fetch_and_save_calendar와 동일 (md5(날짜-제목-시각))
+
+사용: python calendar_watcher.py [--minutes 14]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+
+import pytz
+import requests
+import firebase_admin
+from bs4 import BeautifulSoup, SoupStrainer
+from firebase_admin import credentials, firestore
+
+import host_health
+import http_cache
+from crawler_state import load_state, save_state
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+CALENDAR_URL = "https://ko.tradingeconomics.com/calendar"
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Referer': 'https://ko.tradingeconomics.com/',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
+}
+
+# 캘린더 페이지에 표시되는 시각의 시간대
+CALENDAR_TZ = pytz.timezone(os.environ.get('CALENDAR_TZ', 'UTC'))
+
+WATCH_MINUTES = 14          # 한 번 실행 시 감시 시간 (cron 15분 간격)
+LEAD_SECONDS = 60           # 예정 시각 1분 전부터 확인
+GIVE_UP_MINUTES = 20        # 예정 시각 후 20분까지 값이 없으면 포기 (다음 전체 수집에 맡김)
+POLL_SECONDS = 10           # 발표 시각 전후 확인 간격
+SLOW_POLL_SECONDS = 60      # 발표가 늦어지는 이벤트 확인 간격
+FAST_POLL_WINDOW = 90       # 예정 시각 ±90초 동안만 빠르게 확인
+SCHEDULE_MAX_AGE = 3600
+MIN_IMPORTANCE = int(os.environ.get('CALENDAR_WATCH_MIN_IMPORTANCE', '1'))
+
+def _event_id(date_str, title, time_val):
+    return hashlib.md5(f"{date_str}-{title}-{time_val}".encode()).hexdigest()
+
+def _row_fields(row):
+    """캘린더 행 -> (시각, 제목, actual, forecast, previous). 이벤트 행이 아니면 None"""
+    cols = row.find_all('td')
+    if not cols:
+        return None
+    time_text = cols[0].get_text(strip=True)
+    if "202" in time_text and "월" in time_text:
+        return None
+    event_a = row.select_one('a')
+    title = event_a.get_text(strip=True) if event_a else (cols[2].get_text(strip=True) if len(cols) > 2 else "")
+    if not title:
+        return None
+    return time_text[:5], title, row.get('data-actual', ''), row.get('data-forecast', ''), row.get('data-previous', '')
+
+def refresh_schedule():
+    """
+    전체 캘린더를 한 번 받아 오늘 일정 저장 (공유 HTTP 캐시 사용)
+
+    Returns:
+        {"date": ..., "fetched_at": ..., "events": {event_id: {...}}}
+    """
+    today_str = datetime.now().strftime("%Y-%m-%d")
+    resp = http_cache.get(CALENDAR_URL, kind="calendar", headers=HEADERS, timeout=20)
+    if resp.status_code != 200:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+
+    soup = BeautifulSoup(resp.content, 'html.parser', parse_only=SoupStrainer('tr', attrs={'data-id': True}))
+    events = {}
+    for row in soup.find_all('tr'):
+        fields = _row_fields(row)
+        if not fields:
+            continue
+        time_val, title, actual, _, _ = fields
+        try:
+            scheduled = CALENDAR_TZ.localize(datetime.strptime(f"{today_str} {time_val}", "%Y-%m-%d %H:%M"))
+        except ValueError:
+            continue  # "All Day", 미정 등
+        try:
+            importance = int(row.get('data-importance', '1'))
+        except ValueError:
+            importance = 1
+        eid = _event_id(today_str, title, time_val)
+        events[eid] = {
+            "source_id": row['data-id'],
+            "title": title,
+            "time": time_val,
+            "scheduled_at": scheduled.timestamp(),
+            "importance": importance,
+            "actual": actual
+        }
+
+    schedule = {"date": today_str, "fetched_at": time.time(), "events": events}
+    save_state("calendar_schedule", schedule)
+    logger.info(f"📅 Calendar schedule: {len(events)} timed events today")
+    return schedule
+
+def load_schedule():
+    schedule = load_state("calendar_schedule")
+    stale = time.time() - schedule.get("fetched_at", 0) > SCHEDULE_MAX_AGE
+    if not schedule or stale or schedule.get("date") != datetime.now().strftime("%Y-%m-%d"):
+        schedule = refresh_schedule()
+    return schedule
+
+def due_events(schedule, now):
+    """지금 감시할 이벤트 {event_id: event} (예정 시각 임박 + actual 없음)"""
+    return {
+        eid: ev for eid, ev in schedule["events"].items()
+        if not ev.get("actual") and ev["importance"] >= MIN_IMPORTANCE
+        and ev["scheduled_at"] - LEAD_SECONDS <= now <= ev["scheduled_at"] + GIVE_UP_MINUTES * 60
+    }
+
+def next_window(schedule, now):
+    """다음 감시 시작 시각 (없으면 None)"""
+    starts = [
+        ev["scheduled_at"] - LEAD_SECONDS for ev in schedule["events"].values()
+        if not ev.get("actual") and ev["importance"] >= MIN_IMPORTANCE and ev["scheduled_at"] - LEAD_SECONDS > now
+    ]
+    return min(starts) if starts else None
+
+def poll_interval(due, schedule, now):
+    """다음 확인까지 대기 시간 (발표 시각 전후면 짧게, 늦어지는 이벤트만 남았으면 길게)"""
+    if any(abs(now - ev["scheduled_at"]) <= FAST_POLL_WINDOW for ev in due.values()):
+        return POLL_SECONDS
+    # 다른 이벤트의 발표 시각이 먼저 오면 그때 다시 확인
+    upcoming = [
+        ev["scheduled_at"] - now for ev in schedule["events"].values()
+        if not ev.get("actual") and ev["importance"] >= MIN_IMPORTANCE and ev["scheduled_at"] > now
+    ]
+    return max(POLL_SECONDS, min([SLOW_POLL_SECONDS] + upcoming))
+
+def has_work(schedule, minutes):
+    """이번 실행 구간(minutes) 안에 감시할 이벤트가 있는지"""
+    now = time.time()
+    if due_events(schedule, now):
+        return True
+    start = next_window(schedule, now)
+    return start is not None and start < now + minutes * 60
+
+def poll_rows(session, source_ids):
+    """
+    캘린더 페이지에서 감시 대상 행만 파싱 (캐시 우회)
+
+    Returns:
+        {source_id: (시각, 제목, actual, forecast, previous)}
+    """
+    host_health.check(CALENDAR_URL)
+    try:
+        resp = session.get(CALENDAR_URL, headers=dict(HEADERS, **{'Cache-Control': 'no-cache'}), timeout=10)
+    except requests.RequestException as e:
+        host_health.record(CALENDAR_URL, error=e)
+        raise
+    host_health.record(CALENDAR_URL, status=resp.status_code)
+    if resp.status_code != 200:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+
+    strainer = SoupStrainer('tr', attrs={'data-id': lambda v: v in source_ids})
+    soup = BeautifulSoup(resp.content, 'html.parser', parse_only=strainer)
+    rows = {}
+    for row in soup.find_all('tr'):
+        fields = _row_fields(row)
+        if fields:
+            rows[row['data-id']] = fields
+    return rows
+
+def save_actual(db, eid, ev, actual, forecast, previous):
+    """발표값이 나온 이벤트 문서 1건만 갱신"""
+    if db is None:
+        print(f"[📅 ACTUAL] {ev['time']} {ev['title']} Act:{actual} (Fore:{forecast} Prev:{previous})")
+        return
+    db.collection('economic_calendar').document(eid).set({
+        "actual": str(actual),
+        "forecast": str(forecast),
+        "previous": str(previous),
+        "actual_at": firestore.SERVER_TIMESTAMP,
+        "updated_at": firestore.SERVER_TIMESTAMP
+    }, merge=True)
+
+def watch(db, minutes=WATCH_MINUTES, schedule=None):
+    """
+    minutes 동안 발표 임박 이벤트를 감시
+
+    Returns:
+        갱신한 이벤트 수
+    """
+    end = time.time() + minutes * 60
+    schedule = schedule or load_schedule()
+    session = requests.Session()
+    updated = 0
+
+    while time.time() < end:
+        now = time.time()
+        due = due_events(schedule, now)
+        if not due:
+            start = next_window(schedule, now)
+            if start is None or start >= end:
+                break
+            logger.info(f"⏳ Next release window at {datetime.fromtimestamp(start + LEAD_SECONDS).strftime('%H:%M')}")
+            time.sleep(start - now)
+            continue
+
+        try:
+            rows = poll_rows(session, {ev["source_id"] for ev in due.values()})
+        except Exception as e:
+            logger.warning(f"Calendar poll failed: {e}")
+            rows = {}
+
+        for eid, ev in due.items():
+            fields = rows.get(ev["source_id"])
+            if not fields or not fields[2]:
+                continue
+            _, _, actual, forecast, previous = fields
+            try:
+                save_actual(db, eid, ev, actual, forecast, previous)
+            except Exception as e:
+                logger.error(f"Saving {ev['title']} failed: {e}")
+                continue
+            ev["actual"] = actual
+            updated += 1
+            delay = now - ev["scheduled_at"]
+            logger.info(f"✅ {ev['title']}: actual {actual} ({delay:+.0f}s after schedule)")
+        save_state("calendar_schedule", schedule)
+
+        wait = poll_interval(due_events(schedule, time.time()), schedule, time.time())
+        if time.time() + wait < end:
+            time.sleep(wait)
+        else:
+            break
+
+    logger.info(f"Calendar watcher finished: {updated} events updated")
+    return updated
+
+def _init_db():
+    """Firestore 클라이언트 (자격 증명이 없으면 None -> 콘솔 출력만)"""
+    cred_json = os.environ.get('FIREBASE_CREDENTIALS')
+    if cred_json:
+        cred = credentials.Certificate(json.loads(cred_json))
+    elif os.path.exists("serviceAccountKey.json"):
+        cred = credentials.Certificate("serviceAccountKey.json")
+    else:
+        logger.warning("No Firebase credentials found, printing updates only")
+        return None
+    try:
+        firebase_admin.get_app()
+    except ValueError:
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll economic calendar events around their release time")
+    parser.add_argument("--minutes", type=float, default=WATCH_MINUTES, help="how long to keep watching")
+    args = parser.parse_args()
+
+    logger.info("🚀 Starting Economic Calendar release watcher...")
+    try:
+        schedule = load_schedule()
+    except Exception as e:
+        logger.error(f"Calendar schedule refresh failed: {e}")
+        host_health.flush()
+        return
+    if not has_work(schedule, args.minutes):
+        logger.info(f"No calendar releases in the next {args.minutes:g} minutes. Exiting.")
+        host_health.flush()
+        return
+
+    try:
+        db = _init_db()
+    except Exception as e:
+        logger.error(f"Firebase init error: {e}")
+        sys.exit(1)
+    try:
+        watch(db, args.minutes, schedule)
+    except Exception as e:
+        logger.error(f"Calendar watcher failed: {e}")
+    host_health.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+크롤러 로컬 상태 저장소
+실행 간에 유지되어야 하는 작은 JSON 상태(피드 high-water mark 등)를 파일로 저장
+GitHub Actions에서는 actions/cache로 STATE_DIR을 다음 실행까지 보존
+
+샤딩 실행 시
+- 캐시(http/기사 본문 캐시, gnews 매핑, host health 등)는 모든 워커가 STATE_DIR을 공유
+- 워커 전용 상태(worker=True: 이월 큐, 실행 보고서)는 worker-<i>/ 에 저장
+- 피드 high-water mark는 소스별 파일(keyed state)로 저장 -> 디렉토리 이름이 워커 수와 무관하므로
+  워커 수가 바뀌어도 담당 워커가 바뀐 소스만 mark를 잃음
+"""
+
+import os
+import re
+import json
+import logging
+import tempfile
+
+from sharding import worker_label
+
+logger = logging.getLogger(__name__)
+
+# 상태 파일 위치 (CRAWLER_STATE_DIR 환경변수로 변경 가능)
+STATE_DIR = os.environ.get('CRAWLER_STATE_DIR') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".state"
+)
+WORKER_DIR = os.path.join(STATE_DIR, worker_label()) if worker_label() else STATE_DIR
+
+def state_path(name, worker=False):
+    """상태 이름 -> 파일 경로 (예: feed_high_water -> .state/feed_high_water.json)"""
+    return os.path.join(WORKER_DIR if worker else STATE_DIR, f"{name}.json")
+
+def _read(path, name):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"State '{name}' unreadable, starting fresh: {e}")
+        return None
+
+def load_state(name, default=None, worker=False):
+    """
+    저장된 상태 로드
+
+    파일이 없거나 손상된 경우 default 반환 (상태는 항상 재생성 가능한 캐시로 취급)
+    worker=True면 이 워커 전용 디렉토리에서 로드
+    """
+    path = state_path(name, worker)
+    data = _read(path, name) if os.path.exists(path) else None
+    if data is None:
+        return {} if default is None else default
+    return data
+
+def _write(directory, filename, data, label):
+    os.makedirs(directory, exist_ok=True)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{filename}.", suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(directory, filename))
+    except Exception as e:
+        logger.error(f"State '{label}' save failed: {e}")
+
+def save_state(name, data, worker=False):
+    """상태 저장 (임시 파일에 쓴 뒤 교체하여 중간에 끊겨도 파일이 깨지지 않도록 함)"""
+    _write(WORKER_DIR if worker else STATE_DIR, f"{name}.json", data, name)
+
+def _key_file(key):
+    return re.sub(r"[^0-9A-Za-z_.-]", "_", key) + ".json"
+
+def load_keyed(name, keys, legacy_name=None):
+    """
+    키별 파일 상태 로드 (.state/<name>/<key>.json)
+
+    여러 워커가 서로 다른 키를 맡아도 서로의 기록을 덮어쓰지 않음
+    legacy_name: 키가 없을 때 확인할 이전 단일 파일 상태 이름 (예: feed_high_water)
+
+    Returns:
+        {key: value} - 저장된 키만
+    """
+    directory = os.path.join(STATE_DIR, name)
+    legacy = None
+    result = {}
+    for key in keys:
+        path = os.path.join(directory, _key_file(key))
+        value = _read(path, f"{name}/{key}") if os.path.exists(path) else None
+        if value is None and legacy_name:
+            if legacy is None:
+                old = state_path(legacy_name)
+                legacy = (_read(old, legacy_name) or {}) if os.path.exists(old) else {}
+            value = legacy.get(key)
+        if value is not None:
+            result[key] = value
+    return result
+
+def save_keyed(name, data):
+    """키별 파일 상태 저장 (data의 키만 기록)"""
+    directory = os.path.join(STATE_DIR, name)
+    for key, value in data.items():
+        _write(directory, _key_file(key), value, f"{name}/{key}")
+
+def state_dir(name):
+    """파일 단위 캐시용 하위 디렉토리 (예: article_cache -> .state/article_cache/)"""
+    path = os.path.join(STATE_DIR, name)
+    os.makedirs(path, exist_ok=True)
+    return path
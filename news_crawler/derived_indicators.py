@@ -0,0 +1,212 @@
+"""
+파생 경제지표 계산 (NumPy)
+ecos_crawler는 지표별 최신값과 직전 대비 변동(change_rate)만 저장하므로
+스프레드, 이동평균, 기간별 변동률, z-score를 크롤러에서 미리 계산해 앱은 완성된 숫자만 읽도록 함
+
+- 이력 저장소(economic_indicators/{id}/history/{YYYY}, ecos_backfill.py)의 최근 구간을 갱신한 뒤 로드
+- 모든 지표를 영업일 기준 날짜 x 지표 행렬로 정렬 (월간 지표는 forward fill)
+- 스프레드 열을 추가하고 전체 열에 대해 한 번에 벡터 연산
+- 결과 저장
+  - 기본 지표 문서: economic_indicators/{id}.derived
+  - 스프레드 문서: derived_indicators/{id}
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+from firebase_admin import firestore
+
+from ecos_backfill import HISTORY_COLLECTION, backfill
+from ecos_crawler import INDICATORS
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "derived_indicators"
+
+# long - short (단위 %p)
+SPREADS = [
+    {"id": "spread_10y_3y", "name": "국고채 10년-3년 스프레드", "long": "treasury_10y", "short": "treasury_3y"},
+    {"id": "spread_3y_base", "name": "국고채 3년-기준금리 스프레드", "long": "treasury_3y", "short": "base_rate"},
+    {"id": "spread_cd_base", "name": "CD 91일-기준금리 스프레드", "long": "cd_91d", "short": "base_rate"},
+]
+
+MA_WINDOWS = (5, 20, 60)                                        # 관측치(영업일) 수
+HORIZONS = {"1d": 1, "1w": 5, "1m": 21, "3m": 63, "1y": 250}
+ZSCORE_WINDOW = 60
+LOOKBACK_DAYS = 400                                             # 1년 변동 + 여유
+REFRESH_DAYS = 45                                               # 매 실행 시 이력에 다시 반영하는 최근 구간
+
+def _to_date(period):
+    """ECOS 시점 표기 -> datetime64[D] (월/분기는 첫날)"""
+    if len(period) == 8:
+        return np.datetime64(f"{period[:4]}-{period[4:6]}-{period[6:]}")
+    if "Q" in period:
+        month = (int(period[-1]) - 1) * 3 + 1
+        return np.datetime64(f"{period[:4]}-{month:02d}-01")
+    if len(period) == 6:
+        return np.datetime64(f"{period[:4]}-{period[4:]}-01")
+    return np.datetime64(f"{period[:4]}-01-01")
+
+def load_history(db, indicators, start):
+    """
+    이력 문서 로드 (지표 x 연도 문서를 한 번에 조회)
+
+    Returns:
+        {indicator_id: (dates datetime64[D] 배열, values float 배열)} (날짜순)
+    """
+    years = range(start.year, datetime.now().year + 1)
+    refs = [
+        db.collection('economic_indicators').document(ind["id"]).collection(HISTORY_COLLECTION).document(str(y))
+        for ind in indicators for y in years
+    ]
+    points = {ind["id"]: {} for ind in indicators}
+    for snap in db.get_all(refs):
+        if snap.exists:
+            data = snap.to_dict()
+            points.setdefault(data.get("indicator_id"), {}).update(data.get("points", {}))
+
+    cutoff = np.datetime64(start.strftime("%Y-%m-%d"))
+    series = {}
+    for ind_id, pts in points.items():
+        if not pts:
+            continue
+        dates = np.array([_to_date(p) for p in pts], dtype="datetime64[D]")
+        values = np.array(list(pts.values()), dtype=np.float64)
+        order = np.argsort(dates)
+        dates, values = dates[order], values[order]
+        keep = dates >= cutoff
+        series[ind_id] = (dates[keep], values[keep])
+    return series
+
+def align(series, ids):
+    """
+    날짜 x 지표 행렬 (일간 지표 관측일의 합집합 기준, 빈 칸은 직전 값으로 채움)
+
+    Returns:
+        (dates, matrix) - matrix[:, j]는 ids[j] 지표, 첫 관측 이전은 NaN
+    """
+    daily = [series[i][0] for i in ids if i in series and len(series[i][0]) > 20]
+    if not daily:
+        return np.array([], dtype="datetime64[D]"), np.empty((0, len(ids)))
+    dates = np.unique(np.concatenate(daily))
+    matrix = np.full((len(dates), len(ids)), np.nan)
+    for j, ind_id in enumerate(ids):
+        if ind_id not in series:
+            continue
+        d, v = series[ind_id]
+        # 월간/분기 값은 해당 기간 시작 이후 첫 영업일에 배치
+        rows = np.searchsorted(dates, d)
+        ok = rows < len(dates)
+        matrix[rows[ok], j] = v[ok]
+
+    # forward fill (열별 마지막 유효 행 인덱스의 누적 최대값)
+    valid = ~np.isnan(matrix)
+    idx = np.where(valid, np.arange(len(dates))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    filled = matrix[idx, np.arange(len(ids))]
+    filled[np.cumsum(valid, axis=0) == 0] = np.nan
+    return dates, filled
+
+def compute(matrix):
+    """
+    마지막 행 기준 파생값 (모든 열 한 번에)
+
+    Returns:
+        {필드명: 열별 값 배열}
+    """
+    n = len(matrix)
+    last = matrix[-1]
+    out = {"value": last}
+    for w in MA_WINDOWS:
+        out[f"ma_{w}"] = np.nanmean(matrix[-w:], axis=0) if n >= w else np.full(last.shape, np.nan)
+    for name, h in HORIZONS.items():
+        if n > h:
+            base = matrix[-1 - h]
+            out[f"change_{name}"] = last - base
+            with np.errstate(divide='ignore', invalid='ignore'):
+                out[f"pct_change_{name}"] = np.where(base != 0, (last / base - 1) * 100, np.nan)
+        else:
+            out[f"change_{name}"] = out[f"pct_change_{name}"] = np.full(last.shape, np.nan)
+    if n >= ZSCORE_WINDOW:
+        window = matrix[-ZSCORE_WINDOW:]
+        std = np.nanstd(window, axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[f"zscore_{ZSCORE_WINDOW}"] = np.where(std > 0, (last - np.nanmean(window, axis=0)) / std, 0.0)
+    else:
+        out[f"zscore_{ZSCORE_WINDOW}"] = np.full(last.shape, np.nan)
+    return out
+
+def _num(v):
+    return None if v is None or np.isnan(v) else round(float(v), 4)
+
+def update(db, refresh=True):
+    """
+    파생 지표 계산 후 저장
+
+    Returns:
+        저장한 문서 수
+    """
+    if "MockDB" in str(type(db)):
+        logger.info("Derived indicators skipped (Mock DB has no history)")
+        return 0
+
+    now = datetime.now()
+    if refresh:
+        # 최신 관측치를 이력 저장소에 반영 (checkpoint 없이 최근 구간만)
+        backfill(db, INDICATORS, now - timedelta(days=REFRESH_DAYS), now, use_checkpoint=False)
+
+    series = load_history(db, INDICATORS, now - timedelta(days=LOOKBACK_DAYS))
+    base_ids = [ind["id"] for ind in INDICATORS]
+    dates, matrix = align(series, base_ids)
+    if not len(dates):
+        logger.warning("⚠️ No indicator history yet (run ecos_backfill.py first)")
+        return 0
+
+    # 스프레드 열 추가 -> 기본 지표와 함께 한 번에 계산
+    col = {ind_id: j for j, ind_id in enumerate(base_ids)}
+    spreads = [s for s in SPREADS if s["long"] in col and s["short"] in col]
+    if spreads:
+        matrix = np.hstack([matrix, np.stack([matrix[:, col[s["long"]]] - matrix[:, col[s["short"]]] for s in spreads], axis=1)])
+    results = compute(matrix)
+    as_of = str(dates[-1])
+    captured_at = datetime.now(pytz.utc).isoformat()
+
+    def fields(j, with_pct):
+        return {
+            k: _num(v[j]) for k, v in results.items()
+            if k != "value" and (with_pct or not k.startswith("pct_"))
+        }
+
+    batch = db.batch()
+    count = 0
+    for j, ind in enumerate(INDICATORS):
+        if ind["id"] not in series:
+            continue
+        batch.set(db.collection('economic_indicators').document(ind["id"]), {
+            "derived": dict(fields(j, True), as_of=as_of)
+        }, merge=True)
+        count += 1
+    for k, spread in enumerate(spreads):
+        j = len(base_ids) + k
+        value = _num(results["value"][j])
+        if value is None:
+            continue
+        batch.set(db.collection(COLLECTION_NAME).document(spread["id"]), {
+            "id": spread["id"],
+            "name": spread["name"],
+            "value": value,
+            "change_rate": _num(results["change_1d"][j]) or 0.0,
+            "unit": "%p",
+            "type": "spread",
+            "components": [spread["long"], spread["short"]],
+            "derived": dict(fields(j, False), as_of=as_of),
+            "source": "한국은행",
+            "updated_at": firestore.SERVER_TIMESTAMP,
+            "captured_at": captured_at
+        }, merge=True)
+        count += 1
+    batch.commit()
+    logger.info(f"✅ Derived indicators: {count} documents updated (as of {as_of})")
+    return count
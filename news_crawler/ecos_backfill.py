@@ -0,0 +1,296 @@
+"""
+ECOS 과거 데이터 백필
+fetch_ecos_data는 짧은 기간의 1~50행만 조회하므로, 차트 화면에 필요한 수년치 이력을 채우려면 별도 적재가 필요
+
+- 기간을 구간(일간: 1년 단위, 월간/분기: 전체)과 페이지(PAGE_SIZE 행)로 나눠 병렬 조회
+- ECOS 호출 속도 제한 (초당 RATE_PER_SECOND회), 실패 시 재시도
+- 구간별 checkpoint(로컬 상태 ecos_backfill) -> 중단 후 다시 실행하면 남은 구간만 조회
+- 결과는 연도별 이력 문서로 batch 적재
+  economic_indicators/{id}/history/{YYYY}  {"points": {"20240102": 3.25, ...}}
+
+사용: python ecos_backfill.py --years 10 [--indicators base_rate,usd_krw] [--workers 4] [--restart] [--dry-run]
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+import host_health
+from crawler_state import load_state, save_state
+from ecos_crawler import BASE_URL, ECOS_API_KEY, INDICATORS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "ecos_backfill"
+HISTORY_COLLECTION = "history"
+
+PAGE_SIZE = 1000
+MAX_WORKERS = 4
+RATE_PER_SECOND = float(os.environ.get('ECOS_RATE', '5'))
+RETRIES = 3
+BATCH_LIMIT = 400
+
+_rate_lock = threading.Lock()
+_next_call = 0.0
+
+def _throttle():
+    """ECOS 호출 간격 유지 (모든 작업 스레드 공용)"""
+    global _next_call
+    with _rate_lock:
+        now = time.time()
+        start = max(now, _next_call)
+        _next_call = start + 1.0 / RATE_PER_SECOND
+    if start > now:
+        time.sleep(start - now)
+
+def _period(cycle, dt):
+    """ECOS 주기별 시점 표기 (D: YYYYMMDD, M: YYYYMM, Q: YYYYQn, A: YYYY)"""
+    if cycle == "D":
+        return dt.strftime("%Y%m%d")
+    if cycle == "M":
+        return dt.strftime("%Y%m")
+    if cycle == "Q":
+        return f"{dt.year}Q{(dt.month - 1) // 3 + 1}"
+    return str(dt.year)
+
+def plan_windows(indicator, start, end):
+    """
+    지표별 조회 구간 목록
+
+    일간 지표는 1년 단위(구간당 약 250~366행), 나머지는 전체 기간을 한 구간으로
+    """
+    cycle = indicator["cycle"]
+    if cycle != "D":
+        return [(_period(cycle, start), _period(cycle, end))]
+    windows = []
+    for year in range(start.year, end.year + 1):
+        w_start = max(start, datetime(year, 1, 1))
+        w_end = min(end, datetime(year, 12, 31))
+        windows.append((_period(cycle, w_start), _period(cycle, w_end)))
+    return windows
+
+def _window_key(indicator, window):
+    return f"{indicator['id']}:{window[0]}-{window[1]}"
+
+def _get_page(session, indicator, window, first, last):
+    """
+    한 페이지 조회 (재시도 포함)
+
+    Returns:
+        (rows, list_total_count)
+    """
+    url = (f"{BASE_URL}/{ECOS_API_KEY}/json/kr/{first}/{last}/"
+           f"{indicator['stat_code']}/{indicator['cycle']}/{window[0]}/{window[1]}/{indicator['item_code']}")
+    for attempt in range(1, RETRIES + 1):
+        _throttle()
+        try:
+            host_health.check(url)
+            try:
+                resp = session.get(url, timeout=30)
+            except requests.RequestException as e:
+                host_health.record(url, error=e)
+                raise
+            host_health.record(url, status=resp.status_code)
+            if resp.status_code != 200:
+                raise RuntimeError(f"HTTP {resp.status_code}")
+            data = resp.json()
+            if "StatisticSearch" in data:
+                block = data["StatisticSearch"]
+                return block.get("row", []), int(block.get("list_total_count", 0))
+            result = data.get("RESULT", {})
+            if result.get("CODE") == "INFO-200":
+                # 해당 구간 데이터 없음
+                return [], 0
+            raise RuntimeError(f"ECOS {result.get('CODE')}: {result.get('MESSAGE')}")
+        except host_health.HostUnavailable:
+            raise
+        except Exception as e:
+            if attempt == RETRIES:
+                raise
+            logger.warning(f"Retrying {indicator['id']} {window[0]} page {first} ({e})")
+            time.sleep(2 ** attempt)
+
+def fetch_window(session, indicator, window):
+    """
+    한 구간의 모든 페이지 조회
+
+    Returns:
+        {시점: 값}
+    """
+    rows, total = _get_page(session, indicator, window, 1, PAGE_SIZE)
+    first = PAGE_SIZE + 1
+    while first <= total:
+        more, _ = _get_page(session, indicator, window, first, first + PAGE_SIZE - 1)
+        rows.extend(more)
+        first += PAGE_SIZE
+    points = {}
+    for row in rows:
+        try:
+            points[row["TIME"]] = float(row["DATA_VALUE"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return points
+
+def _by_year(points):
+    years = {}
+    for period, value in points.items():
+        years.setdefault(period[:4], {})[period] = value
+    return years
+
+class HistoryWriter:
+    """연도별 이력 문서 batch 적재 (db가 None이면 로그만)"""
+
+    def __init__(self, db):
+        self.db = db
+        self.batch = db.batch() if db is not None else None
+        self.pending = 0
+        self.written = 0
+
+    def add(self, indicator, points):
+        for year, year_points in _by_year(points).items():
+            if self.db is None:
+                self.written += 1
+                continue
+            ref = (self.db.collection('economic_indicators').document(indicator["id"])
+                   .collection(HISTORY_COLLECTION).document(year))
+            self.batch.set(ref, {
+                "indicator_id": indicator["id"],
+                "name": indicator["name"],
+                "unit": indicator["unit"],
+                "cycle": indicator["cycle"],
+                "year": int(year),
+                "points": year_points,
+                "updated_at": firestore.SERVER_TIMESTAMP
+            }, merge=True)
+            self.pending += 1
+            if self.pending >= BATCH_LIMIT:
+                self.flush()
+
+    def flush(self):
+        if self.db is None or not self.pending:
+            return
+        self.batch.commit()
+        self.written += self.pending
+        self.batch = self.db.batch()
+        self.pending = 0
+
+def backfill(db, indicators, start, end, workers=MAX_WORKERS, restart=False, use_checkpoint=True):
+    """
+    지표 이력 백필
+
+    db가 None이면 (dry run) 조회만 하고 checkpoint도 남기지 않음
+    use_checkpoint=False: 최근 구간 갱신용 (checkpoint를 읽지도 쓰지도 않음)
+
+    Returns:
+        (적재한 구간 수, 실패한 구간 수)
+    """
+    checkpoint = load_state(STATE_NAME) if use_checkpoint and not restart else {}
+    save_checkpoint = db is not None and use_checkpoint
+    tasks = []
+    for indicator in indicators:
+        for window in plan_windows(indicator, start, end):
+            if _window_key(indicator, window) not in checkpoint:
+                tasks.append((indicator, window))
+    skipped = sum(len(plan_windows(i, start, end)) for i in indicators) - len(tasks)
+    logger.info(f"📚 ECOS backfill: {len(tasks)} windows to fetch ({skipped} already done)")
+
+    writer = HistoryWriter(db)
+    done_keys = []
+    loaded = failed = 0
+    session = requests.Session()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_window, session, ind, w): (ind, w) for ind, w in tasks}
+        for future in as_completed(futures):
+            indicator, window = futures[future]
+            try:
+                points = future.result()
+            except Exception as e:
+                failed += 1
+                logger.error(f"❌ {indicator['id']} {window[0]}~{window[1]}: {e}")
+                continue
+            writer.add(indicator, points)
+            done_keys.append((_window_key(indicator, window), len(points)))
+            loaded += 1
+            logger.info(f"  ✅ {indicator['id']} {window[0]}~{window[1]}: {len(points)} points")
+
+            # batch가 커밋된 구간만 checkpoint에 기록
+            if writer.pending == 0 or len(done_keys) >= 20:
+                writer.flush()
+                if save_checkpoint:
+                    checkpoint.update(done_keys)
+                    save_state(STATE_NAME, checkpoint)
+                done_keys = []
+
+    writer.flush()
+    if save_checkpoint:
+        checkpoint.update(done_keys)
+        save_state(STATE_NAME, checkpoint)
+    logger.info(f"📚 ECOS backfill finished: {loaded} windows loaded, {failed} failed, {writer.written} year documents written")
+    return loaded, failed
+
+def _init_db():
+    cred_json = os.environ.get('FIREBASE_CREDENTIALS')
+    if cred_json:
+        cred = credentials.Certificate(json.loads(cred_json))
+    elif os.path.exists("serviceAccountKey.json"):
+        cred = credentials.Certificate("serviceAccountKey.json")
+    else:
+        return None
+    try:
+        firebase_admin.get_app()
+    except ValueError:
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill ECOS indicator history")
+    parser.add_argument("--years", type=int, default=10, help="how many years back from today")
+    parser.add_argument("--indicators", default="", help="comma separated indicator ids (default: all)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--restart", action="store_true", help="ignore checkpoints and fetch everything again")
+    parser.add_argument("--dry-run", action="store_true", help="fetch only, do not write to Firestore")
+    args = parser.parse_args()
+
+    if not ECOS_API_KEY:
+        logger.error("ECOS_API_KEY not set")
+        sys.exit(1)
+
+    wanted = {i.strip() for i in args.indicators.split(",") if i.strip()}
+    indicators = [i for i in INDICATORS if not wanted or i["id"] in wanted]
+    end = datetime.now()
+    start = end.replace(year=end.year - args.years, month=1, day=1)
+
+    db = None
+    if not args.dry_run:
+        try:
+            db = _init_db()
+        except Exception as e:
+            logger.error(f"Firebase init error: {e}")
+            sys.exit(1)
+        if db is None:
+            logger.error("No Firebase credentials found (use --dry-run to fetch without saving)")
+            sys.exit(1)
+
+    loaded, failed = backfill(db, indicators, start, end, workers=args.workers, restart=args.restart)
+    host_health.flush()
+    if failed:
+        logger.warning(f"{failed} windows failed; run again to resume from the checkpoint")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,12 @@ Firestore에 저장하여 Android 앱에서 빠르게 조회 가능
 
 import os
 import logging
-import requests
 import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime
 import pytz
+import http_cache
+import profiling
 
 # Configure logging
 logging.basicConfig(
@@ -111,7 +112,7 @@ def fetch_ecos_data(stat_code, item_code, cycle="D", days=10):
     
     # 날짜 계산
     from datetime import timedelta
-    end_date = datetime.now()
+    now = datetime.now()
     
     if cycle == "M":
         # 월간 데이터: 1년치
@@ -133,7 +134,7 @@ def fetch_ecos_data(stat_code, item_code, cycle="D", days=10):
     logger.info(f"Fetching: {stat_code}/{item_code} ({cycle})")
     
     try:
-        response = requests.get(url, timeout=10)
+        response = http_cache.get(url, kind="ecos", timeout=10)
         
         if response.status_code != 200:
             logger.error(f"HTTP Error: {response.status_code}")
@@ -202,6 +203,7 @@ def main():
     logger.info("🚀 Starting ECOS Economic Indicators Crawler...")
     
     # Firebase 초기화
+    profiling.mark("init")
     try:
         cred_json = os.environ.get('FIREBASE_CREDENTIALS')
         if cred_json:
@@ -230,6 +232,7 @@ def main():
         return
     
     # 경제지표 수집
+    profiling.mark("fetch")
     indicators_data = []
     
     for indicator_config in INDICATORS:
@@ -261,13 +264,26 @@ def main():
             logger.warning(f"Failed to fetch: {indicator_config['name']}")
     
     # Firestore 저장
+    profiling.mark("save")
     if indicators_data:
         save_to_firestore(db, indicators_data)
         logger.info(f"✅ Successfully collected {len(indicators_data)}/{len(INDICATORS)} indicators")
+
+        # 스프레드/이동평균/기간별 변동률 등 파생 지표
+        profiling.mark("derived")
+        try:
+            import derived_indicators
+            derived_indicators.update(db)
+        except Exception as e:
+            logger.error(f"Derived indicators failed: {e}")
     else:
         logger.error("❌ No indicators collected")
     
     logger.info("Done.")
 
 if __name__ == "__main__":
-    main()
+    profiling.enable_from_argv("ecos_crawler")
+    try:
+        main()
+    finally:
+        profiling.finish()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RSS 피드 성능 벤치마크
+test_rss_feeds.py의 순차 확인(피드당 1회, 0.5초 간격) 대신 모든 소스를 동시에 여러 라운드 측정
+
+- 소스별 지연시간 p50/p95/p99, 첫 응답(헤더)까지 시간, 응답 크기, 파싱 시간, 항목 수
+- 최신성: 가장 최근 항목의 나이
+- 결과를 JSON/CSV로 저장하고 직전 보고서와 비교해 느려진/새로 실패한 소스 표시
+- 캐시(http_cache)와 host_health circuit을 거치지 않고 실제 네트워크를 측정
+
+사용: python feed_benchmark.py [--rounds 5] [--out DIR] [--feed NAME=URL ...]
+"""
+
+import os
+import csv
+import json
+import time
+import calendar
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+import feedparser
+
+from crawler_state import state_dir
+
+USER_AGENT = 'Mozilla/5.0 (compatible; MakeNewsBot/1.0)'
+
+# 직전 대비 p50이 이 비율 이상, 그리고 SLOWER_MIN_SECONDS 이상 늘면 "느려짐"
+SLOWER_RATIO = 0.5
+SLOWER_MIN_SECONDS = 0.2
+
+def probe(url, timeout=15):
+    """
+    피드 1회 측정
+
+    Returns:
+        {"ok", "status", "latency", "ttfb", "bytes", "parse_time", "entries", "newest_age", "error"}
+    """
+    result = {"ok": False, "status": None, "latency": None, "ttfb": None, "bytes": 0,
+              "parse_time": None, "entries": 0, "newest_age": None, "error": None}
+    start = time.perf_counter()
+    try:
+        resp = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=timeout)
+        result["latency"] = time.perf_counter() - start
+        result["ttfb"] = resp.elapsed.total_seconds()
+        result["status"] = resp.status_code
+        result["bytes"] = len(resp.content)
+        if resp.status_code != 200:
+            result["error"] = f"HTTP {resp.status_code}"
+            return result
+
+        parse_start = time.perf_counter()
+        feed = feedparser.parse(resp.content)
+        result["parse_time"] = time.perf_counter() - parse_start
+        result["entries"] = len(feed.entries)
+        stamps = [calendar.timegm(e.published_parsed) for e in feed.entries if getattr(e, 'published_parsed', None)]
+        if stamps:
+            result["newest_age"] = time.time() - max(stamps)
+        result["ok"] = bool(feed.entries)
+        if not feed.entries:
+            result["error"] = f"No entries ({feed.bozo_exception})" if feed.bozo else "No entries"
+    except Exception as e:
+        result["latency"] = time.perf_counter() - start
+        result["error"] = f"{type(e).__name__}: {str(e)[:120]}"
+    return result
+
+def _pct(values, q):
+    return round(float(np.percentile(values, q)), 4) if values else None
+
+def summarize(name, url, probes):
+    """소스별 측정 결과 요약"""
+    ok = [p for p in probes if p["ok"]]
+    latencies = [p["latency"] for p in ok]
+    errors = sorted({p["error"] for p in probes if p["error"]})
+    return {
+        "source": name,
+        "url": url,
+        "rounds": len(probes),
+        "success": len(ok),
+        "p50": _pct(latencies, 50),
+        "p95": _pct(latencies, 95),
+        "p99": _pct(latencies, 99),
+        "ttfb_p50": _pct([p["ttfb"] for p in ok], 50),
+        "bytes": int(np.median([p["bytes"] for p in ok])) if ok else 0,
+        "parse_ms": round(float(np.median([p["parse_time"] for p in ok])) * 1000, 2) if ok else None,
+        "entries": max((p["entries"] for p in ok), default=0),
+        "newest_age_min": round(min(p["newest_age"] for p in ok if p["newest_age"] is not None) / 60, 1)
+        if any(p["newest_age"] is not None for p in ok) else None,
+        "errors": errors
+    }
+
+def run_benchmark(feeds, rounds=3, interval=1.0, timeout=15, workers=16):
+    """
+    모든 피드를 동시에 rounds회 측정
+
+    Returns:
+        소스별 요약 목록
+    """
+    names = list(feeds)
+    probes = {name: [] for name in names}
+    with ThreadPoolExecutor(max_workers=min(workers, len(names))) as pool:
+        for r in range(rounds):
+            for name, res in zip(names, pool.map(lambda n: probe(feeds[n], timeout), names)):
+                probes[name].append(res)
+            if r < rounds - 1:
+                time.sleep(interval)
+    return [summarize(name, feeds[name], probes[name]) for name in names]
+
+def compare(results, previous):
+    """
+    직전 보고서와 비교
+
+    Returns:
+        [(source, 사유)] - 느려졌거나 새로 실패한 소스
+    """
+    prev = {r["source"]: r for r in previous.get("results", [])}
+    flagged = []
+    for r in results:
+        p = prev.get(r["source"])
+        if not p:
+            continue
+        if p["success"] and not r["success"]:
+            flagged.append((r["source"], "now failing"))
+        elif r["p50"] is not None and p.get("p50") is not None:
+            if r["p50"] > p["p50"] * (1 + SLOWER_RATIO) and r["p50"] - p["p50"] >= SLOWER_MIN_SECONDS:
+                flagged.append((r["source"], f"p50 {p['p50']:.2f}s -> {r['p50']:.2f}s"))
+    return flagged
+
+def write_report(results, out_dir, flagged):
+    """JSON/CSV 저장 (+ 다음 비교용 latest.json). 저장한 파일 경로 반환"""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    report = {"created_at": datetime.now().isoformat(), "results": results,
+              "flagged": [{"source": s, "reason": why} for s, why in flagged]}
+    json_path = os.path.join(out_dir, f"feed_benchmark-{stamp}.json")
+    csv_path = os.path.join(out_dir, f"feed_benchmark-{stamp}.csv")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(out_dir, "latest.json"), 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    columns = [c for c in results[0] if c != "errors"] + ["errors"] if results else []
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for r in results:
+            writer.writerow(dict(r, errors="; ".join(r["errors"])))
+    return json_path, csv_path
+
+def _cell(value, width, precision=2, suffix=""):
+    text = "-" if value is None else f"{value:.{precision}f}{suffix}"
+    return f"{text:>{width}}"
+
+def print_table(results, flagged):
+    flagged_names = dict(flagged)
+    print(f"{'source':<24}{'ok':>6}{'p50':>8}{'p95':>8}{'p99':>8}{'KB':>9}{'parse':>10}{'items':>7}{'newest':>10}")
+    for r in sorted(results, key=lambda r: (r["p50"] is None, r["p50"] or 0)):
+        line = (f"{r['source'][:23]:<24}{str(r['success']) + '/' + str(r['rounds']):>6}"
+                f"{_cell(r['p50'], 8)}{_cell(r['p95'], 8)}{_cell(r['p99'], 8)}"
+                f"{_cell(r['bytes'] / 1024, 9, 1)}{_cell(r['parse_ms'], 10, 1, 'ms')}{r['entries']:>7}"
+                f"{_cell(r['newest_age_min'], 10, 0, 'min')}")
+        if r['source'] in flagged_names:
+            line += f"  [SLOWER: {flagged_names[r['source']]}]"
+        if r['errors'] and not r['success']:
+            line += f"  [{r['errors'][0]}]"
+        print(line)
+
+def default_feeds():
+    from test_rss_feeds import CURRENT_RSS_FEEDS, PREMIUM_RSS_FEEDS
+    return dict(CURRENT_RSS_FEEDS, **PREMIUM_RSS_FEEDS)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RSS feed sources concurrently")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between rounds")
+    parser.add_argument("--timeout", type=float, default=15)
+    parser.add_argument("--out", default=None, help="report directory (default: .state/benchmarks)")
+    parser.add_argument("--feed", action="append", default=[], metavar="NAME=URL", help="benchmark only these feeds")
+    args = parser.parse_args()
+
+    feeds = dict(f.split("=", 1) for f in args.feed) if args.feed else default_feeds()
+    out_dir = args.out or state_dir("benchmarks")
+    os.makedirs(out_dir, exist_ok=True)
+
+    previous = {}
+    latest = os.path.join(out_dir, "latest.json")
+    if os.path.exists(latest):
+        with open(latest, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+
+    print(f"Benchmarking {len(feeds)} feeds x {args.rounds} rounds...")
+    results = run_benchmark(feeds, rounds=args.rounds, interval=args.interval, timeout=args.timeout)
+    flagged = compare(results, previous)
+    print_table(results, flagged)
+    json_path, csv_path = write_report(results, out_dir, flagged)
+    print(f"\nReport: {json_path}\n        {csv_path}")
+    if previous:
+        print(f"Compared with {previous.get('created_at')}: {len(flagged)} sources slower or failing")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+스트리밍 RSS/Atom 피드 리더
+feedparser.parse는 문서 전체를 파싱해 모든 entry를 만들지만, 크롤러는 상위 몇 개만 사용함
+증분 XML 파서(XMLPullParser)로 받은 만큼만 파싱하고, 필요한 개수를 채우거나
+high-water mark(지난 실행의 최신 기사)에 도달하면 다운로드를 중단
+형식이 깨진 피드는 feedparser로 fallback
+받은 바이트는 공유 HTTP 캐시(http_cache)에 저장되어 다른 스크립트/직후 실행이 재사용
+"""
+
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import feedparser
+import requests
+
+import host_health
+import http_cache
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 8192
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/rss+xml,application/atom+xml,application/xml;q=0.9,*/*;q=0.8'
+}
+
+# RSS 2.0 / RSS 1.0(RDF) 는 item, Atom 은 entry
+ENTRY_TAGS = ("item", "entry")
+
+def _local(tag):
+    """'{namespace}name' -> 'name'"""
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+def _normalize_element(elem):
+    """item/entry XML 요소 -> 정규화된 dict (feedparser entry와 같은 필드 이름 사용)"""
+    fields = {}
+    link = ''
+    for child in elem:
+        name = _local(child.tag)
+        if name == "link":
+            # Atom: <link rel="alternate" href="..."/>, RSS: <link>...</link>
+            href = child.get('href')
+            if href:
+                if not link or child.get('rel', 'alternate') == 'alternate':
+                    link = href
+            elif child.text and not link:
+                link = child.text.strip()
+        elif name not in fields:
+            fields[name] = (child.text or '').strip()
+
+    published = (fields.get('pubDate') or fields.get('published')
+                 or fields.get('updated') or fields.get('date') or str(datetime.now()))
+    description = fields.get('description') or fields.get('summary') or fields.get('content') or ''
+    return {
+        "guid": fields.get('guid') or fields.get('id') or link,
+        "title": fields.get('title', ''),
+        "link": link,
+        "published": published,
+        "description": description
+    }
+
+def _normalize_feedparser_entry(entry):
+    link = getattr(entry, 'link', '')
+    return {
+        "guid": getattr(entry, 'id', '') or link,
+        "title": getattr(entry, 'title', ''),
+        "link": link,
+        "published": getattr(entry, 'published', str(datetime.now())),
+        "description": getattr(entry, 'description', '')
+    }
+
+def _parse_chunks(chunks):
+    """바이트 청크를 증분 파서에 넣으며 완성된 item/entry를 하나씩 반환"""
+    parser = ET.XMLPullParser(events=('end',))
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if _local(elem.tag) in ENTRY_TAGS:
+                yield _normalize_element(elem)
+                # 처리한 요소는 비워서 메모리가 피드 크기에 비례해 늘지 않도록 함
+                elem.clear()
+
+def _iter_streaming(url, timeout, raw):
+    """
+    공유 HTTP 캐시 -> 네트워크 순으로 entry 반환
+    네트워크에서 받은 바이트(조기 종료 시 앞부분만)는 캐시에 저장
+
+    XML 파싱 실패(ET.ParseError) 시 raw에 피드 전체 바이트를 담고 다시 발생
+    (fallback 파서가 같은 바이트를 쓰도록, 네트워크 경로라면 나머지 본문까지 받아 캐시에 저장)
+    """
+    cached = http_cache.lookup(url, kind="rss", allow_partial=True)
+    if cached:
+        meta, body = cached
+        try:
+            yield from _parse_chunks(body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+        except ET.ParseError:
+            if not meta.get("partial"):
+                raw.append(body)
+                raise
+        if not meta.get("partial"):
+            return
+        # 앞부분만 캐시된 경우 나머지는 네트워크에서 (이미 반환한 entry는 호출 측에서 건너뜀)
+
+    host_health.check(url)
+    try:
+        resp = requests.get(url, headers=HEADERS, timeout=timeout, stream=True)
+    except requests.RequestException as e:
+        host_health.record(url, error=e)
+        raise
+    host_health.record(url, status=resp.status_code)
+    received = []
+    complete = False
+    ok = True
+
+    def chunks():
+        for chunk in resp.iter_content(CHUNK_SIZE):
+            received.append(chunk)
+            yield chunk
+
+    try:
+        resp.raise_for_status()
+        yield from _parse_chunks(chunks())
+        complete = True
+    except ET.ParseError:
+        # 나머지 본문을 받아 fallback 파서에 넘김 (다시 다운로드하지 않음)
+        received.extend(resp.iter_content(CHUNK_SIZE))
+        complete = True
+        raw.append(b"".join(received))
+        raise
+    except Exception:
+        ok = False
+        raise
+    finally:
+        # 조기 종료 시 나머지 본문은 받지 않음
+        resp.close()
+        if ok and received:
+            http_cache.store(url, resp.status_code, dict(resp.headers), b"".join(received), partial=not complete)
+
+def iter_feed_entries(url, limit=10, stop_at=None, timeout=15):
+    """
+    피드 entry를 앞에서부터 lazy하게 반환
+
+    Args:
+        url: RSS/Atom 피드 URL
+        limit: 최대 반환 개수
+        stop_at: high-water mark (지난 실행의 최신 entry guid). 만나면 중단
+        timeout: HTTP 타임아웃 (초)
+
+    Yields:
+        {guid, title, link, published, description}
+    """
+    seen = set()
+    raw = []
+    try:
+        for entry in _iter_streaming(url, timeout, raw):
+            if stop_at and entry['guid'] == stop_at:
+                return
+            if entry['guid'] in seen:
+                continue
+            seen.add(entry['guid'])
+            yield entry
+            if len(seen) >= limit:
+                return
+        return
+    except ET.ParseError as e:
+        logger.warning(f"Streaming parse failed ({e}), falling back to feedparser: {url}")
+
+    # Fallback: 깨진 XML(정의되지 않은 엔티티 등)은 이미 받은 바이트를 관대한 feedparser로 다시 파싱
+    feed = feedparser.parse(raw[0])
+    for raw in feed.entries:
+        if len(seen) >= limit:
+            return
+        entry = _normalize_feedparser_entry(raw)
+        if stop_at and entry['guid'] == stop_at:
+            return
+        if entry['guid'] in seen:
+            continue
+        seen.add(entry['guid'])
+        yield entry
@@ -0,0 +1,160 @@
+"""
+Gemini 사용량 기록 및 할당량 circuit breaker
+model.generate_content 호출마다 토큰/지연시간/에러 종류를 기록하고 일별 누적치를 로컬 상태에 저장
+할당량 소진(429 / RESOURCE_EXHAUSTED) 시 circuit을 열어, 이후 호출은 네트워크 요청 없이 즉시 실패
+-> 남은 기사는 타임아웃을 기다리지 않고 바로 다음 실행으로 이월
+"""
+
+import time
+import logging
+from datetime import datetime, timedelta
+
+import pytz
+
+from crawler_state import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "gemini_usage"
+KEEP_DAYS = 14
+
+# 분당 한도 초과 시 대기 시간. 일일 한도는 할당량 리셋 시각(태평양 자정)까지 대기
+RATE_LIMIT_COOLDOWN = 60
+QUOTA_RESET_TZ = pytz.timezone('America/Los_Angeles')
+
+class QuotaExhausted(Exception):
+    """circuit이 열려 있어 호출하지 않음"""
+
+def _is_quota_error(e):
+    text = f"{type(e).__name__} {e}".lower()
+    return any(k in text for k in ("resourceexhausted", "resource_exhausted", "429", "quota", "rate limit"))
+
+def _is_daily_quota(e):
+    text = str(e).lower()
+    return "perday" in text or "per day" in text or "daily" in text
+
+def _next_quota_reset():
+    now = datetime.now(QUOTA_RESET_TZ)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return tomorrow.timestamp()
+
+class MeteredModel:
+    """
+    GenerativeModel 래퍼 (generate_content 인터페이스 동일)
+
+    사용:
+        model = MeteredModel(genai.GenerativeModel(...))
+        for text in model.stream_content(prompt): ...  # 스트리밍 응답 조각
+        if model.circuit_open(): ...  # 할당량 소진 여부
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.state = load_state(STATE_NAME, {"days": {}, "circuit": {}})
+
+    def circuit_open(self):
+        return time.time() < self.state.get("circuit", {}).get("open_until", 0)
+
+    def generate_content(self, prompt, **kwargs):
+        if self.circuit_open():
+            circuit = self.state["circuit"]
+            raise QuotaExhausted(f"Gemini circuit open until {datetime.fromtimestamp(circuit['open_until']).isoformat()} ({circuit.get('reason')})")
+
+        start = time.time()
+        try:
+            response = self.model.generate_content(prompt, **kwargs)
+        except Exception as e:
+            self._record(time.time() - start, error=e)
+            if _is_quota_error(e):
+                self._open_circuit(e)
+            raise
+
+        usage = getattr(response, 'usage_metadata', None)
+        self._record(
+            time.time() - start,
+            prompt_tokens=getattr(usage, 'prompt_token_count', 0) or 0,
+            output_tokens=getattr(usage, 'candidates_token_count', 0) or 0
+        )
+        return response
+
+    def stream_content(self, prompt, **kwargs):
+        """
+        generate_content(stream=True)의 응답 텍스트 조각을 하나씩 반환
+
+        사용량은 스트림이 끝나거나 실패한 뒤 기록. 중간 실패 시 이미 반환한 조각은 유효
+        """
+        if self.circuit_open():
+            circuit = self.state["circuit"]
+            raise QuotaExhausted(f"Gemini circuit open until {datetime.fromtimestamp(circuit['open_until']).isoformat()} ({circuit.get('reason')})")
+
+        start = time.time()
+        response = None
+        try:
+            response = self.model.generate_content(prompt, stream=True, **kwargs)
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # 텍스트 없는 조각 (종료 사유/안전 정보만 있는 경우)
+                    continue
+                if text:
+                    yield text
+        except Exception as e:
+            self._record(time.time() - start, error=e)
+            if _is_quota_error(e):
+                self._open_circuit(e)
+            raise
+
+        usage = getattr(response, 'usage_metadata', None)
+        self._record(
+            time.time() - start,
+            prompt_tokens=getattr(usage, 'prompt_token_count', 0) or 0,
+            output_tokens=getattr(usage, 'candidates_token_count', 0) or 0
+        )
+
+    def today(self):
+        """오늘(UTC) 누적 사용량"""
+        return self.state["days"].get(datetime.now(pytz.utc).strftime("%Y-%m-%d"), {})
+
+    def _record(self, latency, prompt_tokens=0, output_tokens=0, error=None):
+        day_key = datetime.now(pytz.utc).strftime("%Y-%m-%d")
+        days = self.state.setdefault("days", {})
+        day = days.setdefault(day_key, {
+            "calls": 0, "errors": 0, "prompt_tokens": 0, "output_tokens": 0,
+            "latency_total": 0.0, "latency_max": 0.0, "error_classes": {}
+        })
+        day["calls"] += 1
+        day["prompt_tokens"] += prompt_tokens
+        day["output_tokens"] += output_tokens
+        day["latency_total"] = round(day["latency_total"] + latency, 3)
+        day["latency_max"] = round(max(day["latency_max"], latency), 3)
+        if error is not None:
+            day["errors"] += 1
+            name = type(error).__name__
+            day["error_classes"][name] = day["error_classes"].get(name, 0) + 1
+            logger.info(f"Gemini call failed after {latency:.1f}s ({name})")
+        else:
+            logger.info(f"Gemini call: {latency:.1f}s, {prompt_tokens}+{output_tokens} tokens")
+
+        for old in sorted(days)[:-KEEP_DAYS]:
+            del days[old]
+        save_state(STATE_NAME, self.state)
+
+    def _open_circuit(self, error):
+        if _is_daily_quota(error):
+            open_until = _next_quota_reset()
+        else:
+            open_until = time.time() + RATE_LIMIT_COOLDOWN
+        self.state["circuit"] = {"open_until": open_until, "reason": type(error).__name__, "opened_at": time.time()}
+        save_state(STATE_NAME, self.state)
+        logger.warning(f"🚫 Gemini quota exhausted, circuit open until {datetime.fromtimestamp(open_until).isoformat()}")
+
+    def log_summary(self):
+        day = self.today()
+        if not day:
+            return
+        avg = day["latency_total"] / day["calls"] if day["calls"] else 0
+        logger.info(
+            f"📊 Gemini today: {day['calls']} calls, {day['errors']} errors, "
+            f"{day['prompt_tokens']}+{day['output_tokens']} tokens, avg {avg:.1f}s"
+        )
@@ -0,0 +1,149 @@
+"""
+Google News 링크 -> 원문(언론사) URL 변환
+Google News RSS는 news.google.com/rss/articles/<id> 래퍼 링크만 제공하므로
+래퍼 기준 ID로는 WSJ/CNBC 피드에서 직접 받은 같은 기사를 중복으로 인식할 수 없음
+
+1. 구형 ID: base64 디코딩한 protobuf 안에 URL이 그대로 들어 있음 (네트워크 불필요)
+2. 신형 ID (AU_yqL...): 기사 페이지의 서명/타임스탬프로 batchexecute API 호출
+결과는 로컬 상태(gnews_url_map)에 영구 캐시
+"""
+
+import re
+import json
+import time
+import base64
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, quote
+
+import requests
+from bs4 import BeautifulSoup
+
+import host_health
+from crawler_state import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAME = "gnews_url_map"
+CACHE_MAX_ENTRIES = 20000
+MAX_WORKERS = 6
+TIMEOUT = 10
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+BATCH_URL = "https://news.google.com/_/DotsSplashUi/data/batchexecute"
+
+# 링크 해석 요청은 피드와 같은 호스트지만 따로 기록 (해석이 차단돼도 Google News 피드 수집은 계속)
+HEALTH_KEY = "news.google.com#resolver"
+
+_URL_IN_BYTES = re.compile(rb'https?://[\x21-\x7e]+')
+
+def is_google_news_link(url):
+    parsed = urlparse(url or '')
+    return parsed.netloc == "news.google.com" and "/articles/" in parsed.path
+
+def _article_id(url):
+    """news.google.com/rss/articles/<id>?oc=5 -> <id>"""
+    return urlparse(url).path.rstrip('/').split('/')[-1]
+
+def _decode_offline(article_id):
+    """구형 ID는 base64(protobuf) 안에 URL이 포함됨. 신형이면 None"""
+    try:
+        raw = base64.urlsafe_b64decode(article_id + "=" * (-len(article_id) % 4))
+    except Exception:
+        return None
+    # 신형 ID는 디코딩 결과가 'AU_yqL...' 불투명 토큰이라 URL이 없음
+    match = _URL_IN_BYTES.search(raw)
+    return match.group(0).decode('ascii') if match else None
+
+def _decode_online(article_id):
+    """기사 페이지의 data-n-a-sg/data-n-a-ts 값으로 batchexecute 호출"""
+    page_url = f"https://news.google.com/rss/articles/{article_id}"
+    host_health.check(page_url, key=HEALTH_KEY)
+    try:
+        page = requests.get(page_url, headers=HEADERS, timeout=TIMEOUT)
+    except requests.RequestException as e:
+        host_health.record(page_url, error=e, key=HEALTH_KEY)
+        raise
+    host_health.record(page_url, status=page.status_code, key=HEALTH_KEY)
+    page.raise_for_status()
+    node = BeautifulSoup(page.text, 'html.parser').select_one('c-wiz > div[jscontroller]')
+    if node is None or not node.get('data-n-a-sg'):
+        return None
+    signature, timestamp = node['data-n-a-sg'], node['data-n-a-ts']
+
+    inner = (
+        '["garturlreq",[["X","X",["X","X"],null,null,1,1,"US:en",null,1,null,null,null,null,null,0,1],'
+        f'"X","X",1,[1,1,1],1,1,null,0,0,null,0],"{article_id}",{timestamp},"{signature}"]'
+    )
+    payload = json.dumps([[["Fbv4je", inner, None, "generic"]]])
+    try:
+        resp = requests.post(
+            BATCH_URL,
+            headers={**HEADERS, 'Content-Type': 'application/x-www-form-urlencoded;charset=UTF-8'},
+            data=f"f.req={quote(payload)}",
+            timeout=TIMEOUT
+        )
+    except requests.RequestException as e:
+        host_health.record(BATCH_URL, error=e, key=HEALTH_KEY)
+        raise
+    host_health.record(BATCH_URL, status=resp.status_code, key=HEALTH_KEY)
+    resp.raise_for_status()
+    # 응답: )]}'\n\n<json>
+    body = json.loads(resp.text.split("\n\n", 1)[1])[:-2]
+    return json.loads(body[0][2])[1]
+
+def resolve(url):
+    """단일 링크 해석 (캐시 미사용). 실패 시 None"""
+    article_id = _article_id(url)
+    try:
+        return _decode_offline(article_id) or _decode_online(article_id)
+    except Exception as e:
+        logger.debug(f"Google News resolve failed {article_id[:20]}: {e}")
+        return None
+
+def resolve_links(links, max_workers=MAX_WORKERS):
+    """
+    Google News 래퍼 링크들을 원문 URL로 일괄 변환
+
+    Args:
+        links: URL 목록 (Google News가 아닌 링크는 그대로 둠)
+
+    Returns:
+        {원래 링크: 원문 링크} (해석 실패한 링크는 원래 링크 그대로)
+    """
+    cache = load_state(CACHE_NAME)
+    result = {}
+    pending = []
+    hits = 0
+    for link in links:
+        if not is_google_news_link(link):
+            result[link] = link
+            continue
+        hit = cache.get(_article_id(link))
+        if hit:
+            result[link] = hit[0]
+            hits += 1
+        elif link not in pending:
+            pending.append(link)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            resolved = list(pool.map(resolve, pending))
+        now = time.time()
+        ok = 0
+        for link, target in zip(pending, resolved):
+            if target:
+                cache[_article_id(link)] = [target, now]
+                ok += 1
+            result[link] = target or link
+        logger.info(f"🔗 Google News links resolved: {ok}/{len(pending)} (cached {hits})")
+
+        if len(cache) > CACHE_MAX_ENTRIES:
+            # 오래된 매핑부터 제거
+            keep = sorted(cache.items(), key=lambda kv: kv[1][1], reverse=True)[:CACHE_MAX_ENTRIES]
+            cache = dict(keep)
+        save_state(CACHE_NAME, cache)
+    return result
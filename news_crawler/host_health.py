@@ -0,0 +1,117 @@
+"""
+호스트별 상태 기록 및 circuit breaker
+죽었거나 차단된 호스트(Reuters_Business, Investing_News, 403을 주는 TradingEconomics 등)에
+매 실행마다 타임아웃까지 기다리지 않도록, 연속 실패한 호스트는 cool-off 기간 동안 즉시 건너뜀
+cool-off는 실패가 계속될수록 지수적으로 늘어나며, 기간이 끝나면 한 번 재시도(probe)
+
+상태(실패 횟수, 마지막 에러, cool-off 종료 시각)는 로컬 상태(host_health)에 저장
+같은 호스트라도 성격이 다른 요청(예: Google News 피드 vs 기사 링크 해석)은 key로 따로 기록
+"""
+
+import time
+import atexit
+import logging
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+
+from crawler_state import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "host_health"
+
+FAILURE_THRESHOLD = 2       # 연속 실패 N회부터 circuit open
+BASE_COOLOFF = 15 * 60      # 첫 cool-off (초)
+MAX_COOLOFF = 24 * 3600
+
+# 호스트 장애/차단으로 보는 HTTP 상태 (404 등은 URL 문제이므로 제외)
+FAILURE_STATUS = {403, 429, 500, 502, 503, 504}
+
+class HostUnavailable(Exception):
+    """cool-off 중인 호스트라 요청하지 않음"""
+
+_lock = threading.Lock()
+_state = None
+_dirty = False
+
+def _hosts():
+    global _state
+    if _state is None:
+        _state = load_state(STATE_NAME)
+    return _state
+
+def _host(url, key=None):
+    return key or urlparse(url).netloc.lower()
+
+def is_open(url, key=None):
+    """cool-off 중이면 True"""
+    with _lock:
+        record = _hosts().get(_host(url, key))
+        return bool(record) and time.time() < record.get("open_until", 0)
+
+def check(url, key=None):
+    """
+    cool-off 중이면 HostUnavailable
+
+    Args:
+        key: 기록 키 (기본: URL의 호스트)
+    """
+    if is_open(url, key):
+        host = _host(url, key)
+        record = _hosts()[host]
+        until = datetime.fromtimestamp(record["open_until"]).strftime("%H:%M")
+        raise HostUnavailable(f"{host} in cool-off until {until} ({record.get('last_error', '')})")
+
+def record(url, status=None, error=None, key=None):
+    """
+    요청 결과 기록
+
+    Args:
+        status: HTTP 상태 코드 (FAILURE_STATUS면 실패로 간주)
+        error: 예외 (타임아웃, 연결 실패 등)
+        key: 기록 키 (기본: URL의 호스트)
+    """
+    global _dirty
+    host = _host(url, key)
+    if not host:
+        return
+    failed = error is not None or status in FAILURE_STATUS
+    now = time.time()
+    with _lock:
+        rec = _hosts().setdefault(host, {"failures": 0, "successes": 0, "consecutive_failures": 0})
+        if failed:
+            rec["failures"] += 1
+            rec["consecutive_failures"] += 1
+            rec["last_error"] = f"HTTP {status}" if error is None else f"{type(error).__name__}: {str(error)[:120]}"
+            rec["last_failure_at"] = now
+            if rec["consecutive_failures"] >= FAILURE_THRESHOLD:
+                # 실패가 이어질수록 cool-off 2배씩 증가 (15분, 30분, 1시간, ... 최대 24시간)
+                exponent = rec["consecutive_failures"] - FAILURE_THRESHOLD
+                cooloff = min(BASE_COOLOFF * (2 ** exponent), MAX_COOLOFF)
+                rec["open_until"] = now + cooloff
+                logger.warning(f"🔌 {host}: {rec['consecutive_failures']} consecutive failures, skipping for {cooloff // 60:.0f} min")
+        else:
+            if rec["consecutive_failures"]:
+                logger.info(f"🔌 {host}: recovered")
+            rec["successes"] += 1
+            rec["consecutive_failures"] = 0
+            rec["last_success_at"] = now
+            rec.pop("open_until", None)
+        _dirty = True
+
+def summary():
+    """cool-off 중인 호스트 목록 [(host, record)]"""
+    now = time.time()
+    with _lock:
+        return [(h, r) for h, r in _hosts().items() if now < r.get("open_until", 0)]
+
+def flush():
+    global _dirty
+    with _lock:
+        if _dirty and _state is not None:
+            save_state(STATE_NAME, _state)
+            _dirty = False
+
+# 모든 스크립트(main.py, calendar_crawler.py, ecos_crawler.py ...)에서 종료 시 자동 저장
+atexit.register(flush)
@@ -0,0 +1,256 @@
+"""
+공유 HTTP 응답 캐시 (디스크)
+RSS 피드, TradingEconomics 캘린더, ECOS 응답을 main.py / calendar_crawler.py / ecos_crawler.py /
+test_rss_feeds.py 와 직전 실행이 함께 재사용 (같은 응답을 몇 초 간격으로 다시 받지 않음)
+
+- 소스 종류별 TTL
+- stale-while-revalidate: TTL이 지났어도 허용 구간 안이면 캐시를 즉시 반환하고 백그라운드에서 갱신
+- stale-if-error: 네트워크 실패/호스트 cool-off 시 MAX_STALE 이내의 캐시 반환
+- ETag / Last-Modified 조건부 요청 (304면 본문 재다운로드 없음)
+- HTTP 200이어도 본문이 오류 응답이면 저장하지 않음 (ECOS는 오류를 200 + RESULT로 반환)
+- 전체 크기 제한, 오래 사용하지 않은 항목부터 제거
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import host_health
+from crawler_state import state_dir
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('HTTP_CACHE', '1') != '0'
+
+# kind: (TTL 초, stale-while-revalidate 허용 구간 초)
+# ECOS는 실행(하루 몇 번)마다 한 번 읽으므로 허용 구간이 길면 지난 실행의 값을 그대로 저장하게 됨
+TTLS = {
+    "rss": (300, 600),
+    "calendar": (120, 300),
+    "ecos": (3600, 600),
+    "default": (300, 300),
+}
+MAX_STALE = 24 * 3600
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+
+# 이 상태 코드면 (차단/서버 오류) MAX_STALE 이내의 캐시로 대신 응답
+STALE_IF_STATUS = {403, 429, 500, 502, 503, 504}
+
+# 저장하는 응답 헤더 (조건부 요청/인코딩 판단용)
+KEEP_HEADERS = ("content-type", "etag", "last-modified")
+
+def _ecos_payload_ok(content):
+    """ECOS 응답 본문이 오류(최상위 RESULT, INFO-000 이외 코드)가 아닌지"""
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return False
+    result = data.get("RESULT") if isinstance(data, dict) else None
+    return not result or result.get("CODE") == "INFO-000"
+
+# kind: 저장 전 본문 검사 (False면 저장하지 않음)
+PAYLOAD_CHECKS = {
+    "ecos": _ecos_payload_ok,
+}
+
+class CachedResponse:
+    """requests.Response에서 크롤러가 쓰는 부분만 흉내낸 응답 객체"""
+
+    def __init__(self, status_code, content, headers, from_cache=False, age=0.0):
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.from_cache = from_cache
+        self.age = age
+
+    @property
+    def text(self):
+        encoding = get_encoding_from_headers(self.headers) or 'utf-8'
+        return self.content.decode(encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+def _paths(url):
+    key = hashlib.sha1(url.encode()).hexdigest()
+    base = os.path.join(state_dir("http_cache"), key)
+    return base + ".json", base + ".body"
+
+def _read(url):
+    meta_path, body_path = _paths(url)
+    if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+        return None, None
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+        # 접근 시각 갱신 (LRU 제거 기준)
+        os.utime(meta_path)
+        return meta, body
+    except Exception:
+        return None, None
+
+def store(url, status_code, headers, content, partial=False):
+    """응답 저장 (partial=True: 피드 리더가 앞부분만 읽은 경우)"""
+    if not ENABLED:
+        return
+    meta_path, body_path = _paths(url)
+    meta = {
+        "fetched_at": time.time(),
+        "status": status_code,
+        "headers": {k: v for k, v in (headers or {}).items() if k.lower() in KEEP_HEADERS},
+        "partial": partial,
+        "size": len(content)
+    }
+    try:
+        with open(body_path, 'wb') as f:
+            f.write(content)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        _evict()
+    except Exception as e:
+        logger.warning(f"HTTP cache write failed: {e}")
+
+def _touch(url):
+    """304 응답: 저장된 본문을 그대로 두고 수집 시각만 갱신"""
+    meta, _ = _read(url)
+    if meta is None:
+        return
+    meta["fetched_at"] = time.time()
+    with open(_paths(url)[0], 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+def _evict():
+    """전체 크기가 MAX_CACHE_BYTES를 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+    directory = state_dir("http_cache")
+    entries = []
+    total = 0
+    for e in os.scandir(directory):
+        if e.name.endswith(".body"):
+            meta_path = e.path[:-5] + ".json"
+            try:
+                last_used = os.stat(meta_path).st_mtime
+            except OSError:
+                last_used = 0
+            size = e.stat().st_size
+            entries.append((last_used, size, e.path, meta_path))
+            total += size
+    if total <= MAX_CACHE_BYTES:
+        return
+    for _, size, body_path, meta_path in sorted(entries):
+        for p in (body_path, meta_path):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        total -= size
+        if total <= MAX_CACHE_BYTES * 0.8:
+            break
+
+def lookup(url, kind="default", allow_partial=False):
+    """
+    TTL 이내 캐시 항목 반환 (없으면 None)
+
+    Returns:
+        (meta, body)
+    """
+    if not ENABLED:
+        return None
+    meta, body = _read(url)
+    if meta is None or (meta.get("partial") and not allow_partial):
+        return None
+    ttl, _ = TTLS.get(kind, TTLS["default"])
+    if time.time() - meta["fetched_at"] < ttl:
+        return meta, body
+    return None
+
+def _fetch(url, kind, headers, timeout, session, meta):
+    req_headers = dict(headers or {})
+    if meta and not meta.get("partial"):
+        cached = {k.lower(): v for k, v in meta.get("headers", {}).items()}
+        if cached.get("etag"):
+            req_headers["If-None-Match"] = cached["etag"]
+        if cached.get("last-modified"):
+            req_headers["If-Modified-Since"] = cached["last-modified"]
+    host_health.check(url)
+    try:
+        resp = (session or requests).get(url, headers=req_headers, timeout=timeout)
+    except requests.RequestException as e:
+        host_health.record(url, error=e)
+        raise
+    host_health.record(url, status=resp.status_code)
+    if resp.status_code == 304 and meta:
+        _touch(url)
+        return None
+    if resp.status_code == 200:
+        check = PAYLOAD_CHECKS.get(kind)
+        if check is None or check(resp.content):
+            store(url, resp.status_code, dict(resp.headers), resp.content)
+        else:
+            logger.info(f"Not caching {kind} error payload {url[:60]}")
+    return resp
+
+def _revalidate(url, kind, headers, timeout, session, meta):
+    try:
+        _fetch(url, kind, headers, timeout, session, meta)
+    except Exception as e:
+        logger.debug(f"Background revalidation failed {url[:60]}: {e}")
+
+def get(url, kind="default", headers=None, timeout=15, session=None):
+    """
+    캐시를 거치는 GET
+
+    Args:
+        url: 요청 URL
+        kind: TTL 종류 (rss, calendar, ecos, default)
+        headers, timeout, session: requests 인자
+
+    Returns:
+        CachedResponse (from_cache로 캐시 사용 여부 확인)
+    """
+    if not ENABLED:
+        host_health.check(url)
+        try:
+            resp = (session or requests).get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            host_health.record(url, error=e)
+            raise
+        host_health.record(url, status=resp.status_code)
+        return CachedResponse(resp.status_code, resp.content, dict(resp.headers))
+
+    meta, body = _read(url)
+    if meta and meta.get("partial"):
+        meta, body = None, None
+    ttl, swr = TTLS.get(kind, TTLS["default"])
+    age = time.time() - meta["fetched_at"] if meta else None
+
+    if meta and age < ttl:
+        return CachedResponse(meta["status"], body, meta["headers"], from_cache=True, age=age)
+
+    if meta and age < ttl + swr:
+        # stale-while-revalidate: 지금은 캐시로 응답하고 갱신은 백그라운드에서
+        threading.Thread(target=_revalidate, args=(url, kind, headers, timeout, session, meta)).start()
+        return CachedResponse(meta["status"], body, meta["headers"], from_cache=True, age=age)
+
+    try:
+        resp = _fetch(url, kind, headers, timeout, session, meta)
+    except Exception:
+        if meta and age < MAX_STALE:
+            logger.warning(f"Network error, serving cached response ({age / 60:.0f} min old)")
+            return CachedResponse(meta["status"], body, meta["headers"], from_cache=True, age=age)
+        raise
+    if resp is None:
+        # 304 Not Modified
+        return CachedResponse(meta["status"], body, meta["headers"], from_cache=True, age=0.0)
+    if resp.status_code in STALE_IF_STATUS and meta and age < MAX_STALE:
+        logger.warning(f"HTTP {resp.status_code}, serving cached response ({age / 60:.0f} min old)")
+        return CachedResponse(meta["status"], body, meta["headers"], from_cache=True, age=age)
+    return CachedResponse(resp.status_code, resp.content, dict(resp.headers))
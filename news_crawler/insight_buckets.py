@@ -0,0 +1,210 @@
+"""
+시간 버킷 인덱스 (선택적 저장 레이아웃, BUCKET_LAYOUT=1)
+모든 기사가 md5 키의 평면 컬렉션(investment_insights)에만 있으면 "최근 1시간 기사", 중복 확인 창,
+보관 기간 정리가 필요 이상으로 많은 문서를 읽음
+기사 문서는 그대로 두고(앱 호환), 시간/일 버킷 문서에 기사 ID 목록을 함께 기록
+
+insight_buckets/
+  h_<YYYYMMDDHH>   {"kind": "hour", "hour_start", "day", "ids": [...]}
+  d_<YYYYMMDD>     {"kind": "day", "day_start", "hours": [버킷 ID...]}
+  meta             {"since": 버킷 기록 시작 시각}
+
+- 중복 확인: 최근 DEDUP_HOURS 시간 버킷의 ID 목록으로 확인, 창 밖 기사만 평면 컬렉션 조회
+  실행마다 DedupWindow 하나를 만들어, 후보 기사의 발행 시각 이후 버킷만 처음 필요할 때 한 번씩 읽음
+- 버킷 기록 시작(meta.since) 이전 구간은 평면 컬렉션으로 확인 (호환 경로)
+- retention.py는 만료된 시간 버킷의 ID 목록으로 바로 삭제
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import pytz
+from dateutil import parser as date_parser
+from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('BUCKET_LAYOUT', '0') == '1'
+
+COLLECTION_NAME = "insight_buckets"
+DEDUP_HOURS = 72
+# 발행 시각이 창 시작보다 이만큼 이후여야 버킷만으로 판단 (피드 시각 오차 여유)
+PUBLISH_MARGIN = timedelta(hours=2)
+
+_lock = threading.Lock()
+_pending = {}
+_since = None
+
+def hour_key(ts):
+    return f"h_{ts.astimezone(pytz.utc).strftime('%Y%m%d%H')}"
+
+def day_key(ts):
+    return f"d_{ts.astimezone(pytz.utc).strftime('%Y%m%d')}"
+
+def _hour_start(ts):
+    return ts.astimezone(pytz.utc).replace(minute=0, second=0, microsecond=0)
+
+def add(doc):
+    """저장한 기사 문서를 해당 시간 버킷에 등록 (flush 때 기록)"""
+    if not ENABLED:
+        return
+    analyzed_at = doc.get("meta_data", {}).get("analyzed_at") or datetime.now(pytz.utc)
+    with _lock:
+        _pending.setdefault(_hour_start(analyzed_at), set()).add(doc["id"])
+
+def flush(db):
+    """
+    등록된 기사 ID를 시간/일 버킷 문서에 추가 (ArrayUnion)
+
+    Returns:
+        갱신한 시간 버킷 수
+    """
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return 0
+    if "MockDB" in str(type(db)):
+        for hour, ids in sorted(pending.items()):
+            print(f"[🗂️ BUCKET] {hour_key(hour)}: +{len(ids)} ids")
+        return len(pending)
+
+    col = db.collection(COLLECTION_NAME)
+    batch = db.batch()
+    for hour, ids in pending.items():
+        batch.set(col.document(hour_key(hour)), {
+            "kind": "hour",
+            "hour_start": hour,
+            "day": hour.strftime('%Y%m%d'),
+            "ids": firestore.ArrayUnion(sorted(ids)),
+            "updated_at": firestore.SERVER_TIMESTAMP
+        }, merge=True)
+        batch.set(col.document(day_key(hour)), {
+            "kind": "day",
+            "day_start": hour.replace(hour=0),
+            "hours": firestore.ArrayUnion([hour_key(hour)]),
+            "updated_at": firestore.SERVER_TIMESTAMP
+        }, merge=True)
+    batch.commit()
+    if coverage_start(db) is None:
+        # 버킷 기록 시작 시각 (이전 구간은 평면 컬렉션으로 확인)
+        col.document("meta").set({"since": min(pending)}, merge=True)
+    return len(pending)
+
+def coverage_start(db):
+    """버킷 기록이 시작된 시각 (없으면 None)"""
+    global _since
+    if _since is None:
+        snap = db.collection(COLLECTION_NAME).document("meta").get()
+        if snap.exists:
+            _since = snap.to_dict().get("since")
+    return _since
+
+def ids_between(db, start, end):
+    """start~end 구간 시간 버킷들의 기사 ID 집합"""
+    col = db.collection(COLLECTION_NAME)
+    hour = _hour_start(start)
+    refs = []
+    while hour <= end:
+        refs.append(col.document(hour_key(hour)))
+        hour += timedelta(hours=1)
+    ids = set()
+    for snap in db.get_all(refs):
+        if snap.exists:
+            ids.update(snap.to_dict().get("ids", []))
+    return ids
+
+def recent_ids(db, hours=1):
+    """최근 hours시간 동안 저장된 기사 ID"""
+    now = datetime.now(pytz.utc)
+    return ids_between(db, now - timedelta(hours=hours), now)
+
+def _published(art):
+    try:
+        published = date_parser.parse(art.get('published', ''))
+    except (ValueError, OverflowError, TypeError):
+        return None
+    if published.tzinfo is None:
+        published = pytz.utc.localize(published)
+    return published
+
+def in_window(art, window_start):
+    """발행 시각상 창 안에서만 저장될 수 있는 기사인지 (발행 시각을 모르면 False)"""
+    published = _published(art)
+    return published is not None and published >= window_start + PUBLISH_MARGIN
+
+class DedupWindow:
+    """
+    실행 단위 중복 확인 창
+
+    사용:
+        window = DedupWindow(db)         # 실행마다 한 번
+        known = window.known(articles)   # {기사 ID: 이미 저장됨 여부}, 창 밖 기사는 빠짐
+        window.add(ids)                  # 이번 실행에서 저장하는 기사
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.start = None
+        self.ids = set()
+        self.hours = set()  # 이미 읽은 시간 버킷
+        if ENABLED and "MockDB" not in str(type(db)):
+            since = coverage_start(db)
+            if since is not None:
+                self.start = max(datetime.now(pytz.utc) - timedelta(hours=DEDUP_HOURS), since)
+
+    def known(self, articles):
+        """
+        창 안에서 판단할 수 있는 기사의 저장 여부
+
+        발행 시각(여유 PUBLISH_MARGIN 포함) 이후 버킷에만 저장될 수 있으므로
+        가장 이른 발행 시각부터 현재까지 중 아직 읽지 않은 버킷만 읽음
+        """
+        if self.start is None:
+            return {}
+        covered = [art for art in articles if in_window(art, self.start)]
+        if not covered:
+            return {}
+        earliest = min(_published(art) for art in covered) - PUBLISH_MARGIN
+        self._load(earliest, datetime.now(pytz.utc))
+        return {art['id']: art['id'] in self.ids for art in covered}
+
+    def _load(self, start, end):
+        col = self.db.collection(COLLECTION_NAME)
+        hour = _hour_start(start)
+        refs = []
+        while hour <= end:
+            key = hour_key(hour)
+            if key not in self.hours:
+                self.hours.add(key)
+                refs.append(col.document(key))
+            hour += timedelta(hours=1)
+        if not refs:
+            return
+        for snap in self.db.get_all(refs):
+            if snap.exists:
+                self.ids.update(snap.to_dict().get("ids", []))
+
+    def add(self, ids):
+        self.ids.update(ids)
+
+def expired_hours(db, cutoff, limit=50):
+    """cutoff 이전 시간 버킷 스냅샷 (오래된 순)"""
+    query = (db.collection(COLLECTION_NAME)
+             .where(filter=FieldFilter("hour_start", "<", cutoff))
+             .order_by("hour_start")
+             .limit(limit))
+    return list(query.stream())
+
+def drop_days_before(db, cutoff):
+    """cutoff 이전 일 버킷 문서 삭제"""
+    snaps = list(db.collection(COLLECTION_NAME).where(filter=FieldFilter("day_start", "<", cutoff)).limit(400).stream())
+    if snaps:
+        batch = db.batch()
+        for snap in snaps:
+            batch.delete(snap.reference)
+        batch.commit()
+    return len(snaps)
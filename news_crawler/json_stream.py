@@ -0,0 +1,104 @@
+"""
+증분 JSON 배열 디코더
+스트리밍 LLM 응답("[{...}, {...}, ...]")을 조각 단위로 받아, 완성된 항목 객체를 도착하는 즉시 반환
+전체 응답을 기다리지 않으므로 첫 항목을 바로 저장할 수 있고, 중간에 스트림이 끊겨도 이미 받은 항목은 유지
+
+- 앞뒤의 ```json 코드 펜스나 설명 문장은 무시 (첫 '[' 또는 '{'부터 해석)
+- 문자열 안의 괄호/따옴표(이스케이프 포함)는 구조로 취급하지 않음
+- 배열 바로 아래의 객체(또는 배열 없이 나열된 객체)만 항목으로 반환
+- 해석할 수 없는 항목은 건너뛰고 다음 항목부터 계속
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ArrayItemDecoder:
+    """
+    사용:
+        decoder = ArrayItemDecoder()
+        for text in chunks:
+            for item in decoder.feed(text):
+                ...
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0            # 다음에 볼 문자 위치
+        self.depth = 0          # 현재 괄호 깊이 ([, {)
+        self.in_string = False
+        self.escape = False
+        self.item_start = None  # 진행 중인 항목 객체의 시작 위치
+        self.item_depth = None  # 항목 객체가 열린 깊이
+        self.items = 0
+        self.errors = 0
+
+    def feed(self, text):
+        """
+        응답 조각 추가
+
+        Returns:
+            이번 조각으로 완성된 항목(dict) 목록
+        """
+        self.buffer += text
+        done = []
+        buf = self.buffer
+        i = self.pos
+        while i < len(buf):
+            ch = buf[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                if self.depth > 0:
+                    self.in_string = True
+            elif ch in "[{":
+                if ch == "{" and self.item_start is None and self.depth <= 1:
+                    self.item_start = i
+                    self.item_depth = self.depth
+                self.depth += 1
+            elif ch in "]}":
+                self.depth = max(0, self.depth - 1)
+                if ch == "}" and self.item_start is not None and self.depth == self.item_depth:
+                    item = self._decode(buf[self.item_start:i + 1])
+                    if item is not None:
+                        done.append(item)
+                    self.item_start = None
+            i += 1
+
+        # 완성된 항목 앞부분은 버려 버퍼가 응답 길이만큼 커지지 않도록 함
+        keep = self.item_start if self.item_start is not None else i
+        self.buffer = buf[keep:]
+        self.pos = i - keep
+        if self.item_start is not None:
+            self.item_start = 0
+        return done
+
+    def _decode(self, text):
+        try:
+            item = json.loads(text)
+        except ValueError as e:
+            self.errors += 1
+            logger.warning(f"Skipping undecodable item in streamed response: {e}")
+            return None
+        if not isinstance(item, dict):
+            return None
+        self.items += 1
+        return item
+
+    def pending(self):
+        """항목이 열린 채로 끝났는지 (스트림이 중간에 끊김)"""
+        return self.item_start is not None
+
+def iter_items(chunks):
+    """텍스트 조각 iterable -> 완성된 항목을 하나씩 반환"""
+    decoder = ArrayItemDecoder()
+    for text in chunks:
+        yield from decoder.feed(text)
+    if decoder.pending():
+        logger.warning(f"Streamed response ended mid-item after {decoder.items} items")
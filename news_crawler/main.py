@@ -1,7 +1,6 @@
 import os
 import json
 import logging
-import feedparser
 import firebase_admin
 from firebase_admin import credentials
 from firebase_admin import firestore
@@ -10,8 +9,32 @@ from datetime import datetime, timedelta
 import pytz
 import hashlib
 import time
+import itertools
 import requests
 from bs4 import BeautifulSoup
+import analysis_queue
+import article_fetcher
+import http_cache
+import relevance_model
+import story_clusters
+import text_clean
+from crawler_state import load_keyed, save_keyed, save_state
+from feed_reader import iter_feed_entries
+from gemini_usage import MeteredModel
+from gnews_resolver import resolve_links
+import host_health
+import insight_buckets
+import json_stream
+import news_digest
+import pipeline
+import profiling
+import reanalysis
+import retention
+from host_health import HostUnavailable
+from run_deadline import Deadline
+from run_lease import LEASE_MODE, RunLease
+from sharding import SHARD_INDEX, SHARD_COUNT, select_feeds
+from url_canon import article_id, legacy_id
 # Random module removed to prevent ANY fake data generation
 
 # --- Configuration ---
@@ -36,6 +59,32 @@ RSS_FEEDS = {
     "Google_Global_Markets": "https://news.google.com/rss/search?q=Global+Markets+when:1d&hl=en-US&gl=US&ceid=US:en"
 }
 
+# Top N entries per feed; the streaming reader stops downloading after this many
+MAX_ENTRIES_PER_FEED = 10
+
+# Also look up pre-canonicalisation IDs during dedup (disable once old documents expire)
+LEGACY_ID_CHECK = True
+
+# Rough worst-case duration of each phase, checked against the run deadline before starting it
+PHASE_SECONDS = {
+    "feed": 20,
+    "enrich": 60,
+    "llm_batch": 45,
+    "calendar": 25,
+    "ecos": 60,
+    "derived": 20,
+}
+
+# Token budgets for article text: stored RSS descriptions, and the body sent per item in the analysis prompt
+DESCRIPTION_TOKENS = 400
+PROMPT_BODY_TOKENS = 300
+
+# Articles per Gemini request
+BATCH_SIZE = 5
+
+# Feed chunks buffered between pipeline stages; a slow stage makes the one before it wait
+PIPELINE_QUEUE_SIZE = 4
+
 def load_local_properties():
     """Helper to read local.properties from Android project root"""
     props = {}
@@ -118,6 +167,8 @@ def initialize_services():
             except Exception:
                 model = genai.GenerativeModel('models/gemini-1.5-flash')
                 logger.info("✅ Gemini API configured successfully (models/gemini-1.5-flash)")
+            # Track tokens/latency/errors and stop calling once the quota is exhausted
+            model = MeteredModel(model)
         except Exception as e:
             logger.error(f"Gemini configuration failed: {e}")
             model = None
@@ -126,46 +177,230 @@ def initialize_services():
     
     return firestore.client(), model
 
-def fetch_feeds():
-    """Fetch REAL RSS feeds."""
-    articles = []
-    for source, url in RSS_FEEDS.items():
+def iter_feeds(high_water=None, deadline=None, report=None):
+    """
+    Fetch REAL RSS feeds, yielding one list of articles (with IDs) per feed as soon as it is read.
+
+    high_water: {source: newest guid seen last run}. Reading stops at that entry,
+    and the dict is updated in place with this run's newest guid per source.
+    deadline: run Deadline; feeds not reached in time keep their high-water mark.
+    report: run report whose "fetched" count is incremented.
+    """
+    for source, url in select_feeds(RSS_FEEDS).items():
+        if deadline and not deadline.allows(PHASE_SECONDS["feed"], what="remaining feeds"):
+            break
+        articles = []
         try:
-            feed = feedparser.parse(url)
-            if not feed.entries:
-                logger.warning(f"No entries found for {source}")
+            stop_at = high_water.get(source) if high_water is not None else None
+            timeout = deadline.timeout(15) if deadline else 15
+            entries = list(iter_feed_entries(url, limit=MAX_ENTRIES_PER_FEED, stop_at=stop_at, timeout=timeout))
+            if not entries:
+                if stop_at:
+                    logger.info(f"No new entries for {source}")
+                else:
+                    logger.warning(f"No entries found for {source}")
                 continue
+            if high_water is not None:
+                high_water[source] = entries[0]['guid']
                 
-            for entry in feed.entries[:10]: # Process top 10 real items
+            for entry in entries: # Process top 10 real items
                 # Validate essential fields
-                if not hasattr(entry, 'link') or not hasattr(entry, 'title'):
+                if not entry['link'] or not entry['title']:
                     continue
                     
                 articles.append({
-                    "id": hashlib.md5(entry.link.encode()).hexdigest(),
-                    "title": entry.title,
-                    "link": entry.link,
-                    "published": getattr(entry, 'published', str(datetime.now())),
+                    "title": entry['title'],
+                    "link": entry['link'],
+                    "published": entry['published'],
                     "source": source,
-                    "full_content": getattr(entry, 'description', '')
+                    # Plain text without markup/boilerplate, capped to a token budget
+                    "full_content": text_clean.clean_description(entry['description'], entry['title'], DESCRIPTION_TOKENS)
                 })
+        except HostUnavailable as e:
+            logger.info(f"⏭️ Skipping {source}: {e}")
         except Exception as e:
             logger.error(f"Feed error {source}: {e}")
-    return articles
 
-def filter_new_articles(db, articles):
+        if articles:
+            assign_article_ids(articles)
+            if report is not None:
+                report["fetched"] += len(articles)
+            yield articles
+
+def assign_article_ids(articles):
+    """
+    Resolve Google News wrapper links to publisher URLs, then derive IDs from the
+    canonical URL, so the same story from any feed or link variant shares one ID.
+    IDs computed the old way (md5 of the raw link) are kept in 'legacy_ids' so
+    documents saved before canonicalisation still dedup.
+    """
+    resolved = resolve_links([art['link'] for art in articles])
+    for art in articles:
+        raw_link = art['link']
+        link = resolved.get(raw_link, raw_link)
+        if link != raw_link:
+            art['wrapper_link'] = raw_link
+            art['link'] = link
+        art['id'] = article_id(link)
+        art['legacy_ids'] = [i for i in dict.fromkeys([legacy_id(raw_link), legacy_id(link)]) if i != art['id']]
+
+def filter_new_articles(db, articles, window=None):
     if not articles: return []
+    # Bucket layout: articles published inside the dedup window are checked against the
+    # window's hour buckets; older ones (or no buckets yet) fall back to per-document lookups
+    known = (window or insight_buckets.DedupWindow(db)).known(articles)
     new_items = []
     for art in articles:
+        if art['id'] in known:
+            if not known[art['id']]:
+                new_items.append(art)
+            continue
         # Check if ID exists in Firestore
         doc_ref = db.collection('investment_insights').document(art['id'])
-        if not doc_ref.get().exists:
-            new_items.append(art)
+        if doc_ref.get().exists:
+            continue
+        # Migration: documents saved under pre-canonical IDs count as existing
+        if LEGACY_ID_CHECK and any(
+            db.collection('investment_insights').document(lid).get().exists
+            for lid in art.get('legacy_ids', [])
+        ):
+            continue
+        new_items.append(art)
     return new_items
 
-def analyze_batch(model, articles):
-    results = []
-    if not articles: return []
+def dedup_stage(db, chunks, lease, report, window):
+    """Drop articles already stored or claimed by another live run; yields the remaining chunks."""
+    for chunk in chunks:
+        new_articles = filter_new_articles(db, chunk, window)
+        # Claim markers: articles another live run already took are left to it
+        new_articles = lease.claim(new_articles)
+        # Everything passed on is saved (or deferred) by this run
+        window.add(art['id'] for art in new_articles)
+        report["new"] += len(new_articles)
+        if new_articles:
+            yield new_articles
+
+def enrich_stage(chunks, deadline):
+    """Optional enrichment: fetch linked article pages for real body text (ARTICLE_FETCH=1)."""
+    enabled = article_fetcher.ENABLED
+    for chunk in chunks:
+        if enabled and not deadline.allows(PHASE_SECONDS["enrich"], what="article enrichment"):
+            enabled = False
+        if enabled:
+            article_fetcher.enrich_articles(chunk)
+        yield chunk
+
+def analyse_and_save(db, model, chunks, deadline, report):
+    """
+    Last pipeline stage. Pre-scored skips (and everything, without a model) are saved as chunks
+    arrive; LLM candidates are buffered in a bounded priority heap and the run's token budget is
+    spent once fetching ends, so the highest-value articles across all feeds go first.
+
+    Returns (articles deferred to the next run - highest priority first, unspent token budget).
+    """
+    clusters = story_clusters.StoryClusters.load(db) if model else None
+    budget = analysis_queue.run_budget()
+    candidates = analysis_queue.CandidateHeap()
+    followers = []
+    if not model:
+        logger.warning("⚠️ Skipping AI Analysis (No API Key). Using metadata only.")
+
+    for chunk in chunks:
+        if not model:
+            save_fallbacks(db, chunk, report)
+            continue
+
+        # Cheap local relevance model: low-value items skip the LLM and keep a local estimate
+        chunk, skipped = relevance_model.prescore(db, chunk)
+        for art in skipped:
+            art['prescore_skipped'] = True
+            save_article(db, build_document(art, None))
+        report["local"] += len(skipped)
+
+        # One analysis per story: articles about the same event share their cluster's analysis
+        chunk, chunk_followers = clusters.assign(chunk)
+        followers.extend(chunk_followers)
+        for art in chunk:
+            candidates.push(art)
+
+    if not model:
+        return [], budget
+
+    # Highest-value articles first across the whole run, within its token budget
+    deferred = list(candidates.overflow)
+    selected, over = analysis_queue.plan_analysis(candidates.drain(), budget, body_tokens=PROMPT_BODY_TOKENS)
+    budget -= sum(analysis_queue.estimate_tokens(art, PROMPT_BODY_TOKENS) for art in selected)
+    deferred.extend(over)
+    deferred.extend(analyse_batches(db, model, clusters, selected, deadline, report))
+
+    # Cluster followers reuse the representative's analysis; if it was deferred, so are they
+    if followers:
+        deferred_clusters = {art.get('cluster_id') for art in deferred}
+        for art in followers:
+            analysis = clusters.analysis_for(art)
+            if not analysis and art['cluster_id'] in deferred_clusters:
+                deferred.append(art)
+                continue
+            save_article(db, build_document(art, analysis, shared=True))
+            if not analysis:
+                reanalysis.add(art, PROMPT_BODY_TOKENS)
+            report["shared" if analysis else "fallback"] += 1
+
+    clusters.save(db)
+    deferred.sort(key=analysis_queue.score_article, reverse=True)
+    return deferred, budget
+
+def analyse_batches(db, model, clusters, articles, deadline, report):
+    """
+    Analyse the selected articles in BATCH_SIZE batches, saving each item as it is streamed back.
+
+    Returns the articles deferred by the deadline or an exhausted quota.
+    """
+    for i in range(0, len(articles), BATCH_SIZE):
+        batch_arts = articles[i:i+BATCH_SIZE]
+
+        # Out of time: stop taking new LLM batches and carry the rest to the next run
+        if not deadline.allows(PHASE_SECONDS["llm_batch"], what="remaining LLM batches"):
+            return articles[i:]
+
+        analysed = set()
+        try:
+            for res in analyze_batch(model, batch_arts, timeout=deadline.timeout(60)):
+                idx = res.get('item_index')
+                if not isinstance(idx, int) or not 0 <= idx < len(batch_arts) or idx in analysed:
+                    continue
+                analysed.add(idx)
+                art = batch_arts[idx]
+                clusters.set_analysis(art.get('cluster_id'), res)
+                save_article(db, build_document(art, res))
+                report["analysed"] += 1
+        except Exception as e:
+            logger.error(f"Batch Analysis Error: {e}")
+
+        # Quota ran out: defer the rest of this batch and everything after it instead of saving fallbacks
+        if model.circuit_open():
+            logger.warning("⏸️ Gemini quota exhausted. Deferring remaining articles to the next run.")
+            return [art for n, art in enumerate(batch_arts) if n not in analysed] + articles[i+BATCH_SIZE:]
+
+        # Articles the model did not return get the fallback document and wait in the re-analysis backlog
+        save_fallbacks(db, [art for n, art in enumerate(batch_arts) if n not in analysed], report)
+
+        time.sleep(1)
+    return []
+
+def save_fallbacks(db, articles, report):
+    """Save articles without an analysis (status pending) and queue them in the re-analysis backlog."""
+    for art in articles:
+        save_article(db, build_document(art, None))
+        reanalysis.add(art, PROMPT_BODY_TOKENS)
+        report["fallback"] += 1
+
+def analyze_batch(model, articles, timeout=None):
+    """
+    Stream the Gemini analysis of a batch, yielding each item object as soon as it is complete.
+    A failure mid-stream is logged and ends the generator; items already yielded stay valid.
+    """
+    if not articles: return
     
     prompt = """
     Analyze these REAL economic news articles.
@@ -184,18 +419,94 @@ def analyze_batch(model, articles):
     """
     for idx, art in enumerate(articles):
         prompt += f"\n[{idx}] Title: {art['title']}\n"
+        # Fetched article body, otherwise the cleaned RSS description
+        body = text_clean.compact(art.get('article_text') or art.get('full_content') or '', PROMPT_BODY_TOKENS)
+        if body:
+            prompt += f"    Content: {body}\n"
 
     try:
-        response = model.generate_content(prompt)
-        cleaned = response.text.replace("```json", "").replace("```", "").strip()
-        data = json.loads(cleaned)
-        if isinstance(data, list):
-            return data
+        if timeout:
+            chunks = model.stream_content(prompt, request_options={"timeout": timeout})
         else:
-            return []
+            chunks = model.stream_content(prompt)
+        yield from json_stream.iter_items(chunks)
     except Exception as e:
         logger.error(f"Analysis Failed: {e}")
-        return []
+
+def build_document(art, ai_data, shared=False):
+    """
+    investment_insights document for an article, from AI results or fallback content.
+
+    shared: ai_data is the story cluster representative's analysis. Only its intelligence
+    fields are used; title and body stay this article's own.
+    """
+    if ai_data and not shared:
+        korean_title = ai_data.get('korean_title', art['title'])
+        korean_body = ai_data.get('korean_body', '번역 불가')
+    else:
+        # FALLBACK - Use RSS description/summary as body content
+        # Even without AI, provide actual article content to users
+        korean_title = art['title']  # Original English title
+        
+        # Prefer the fetched article body, then RSS description, otherwise a helpful message
+        note = "[같은 사건 기사의 AI 분석을 공유합니다 - 원문 기사입니다. 자세한 내용은 원문 링크를 확인하세요.]" if ai_data \
+            else "[AI 번역 대기 중 - 원문 기사입니다. 자세한 내용은 원문 링크를 확인하세요.]"
+        rss_description = (art.get('article_text') or art.get('full_content', '')).strip()
+        if rss_description and len(rss_description) > 20:
+            korean_body = f"{rss_description}\n\n{note}"
+        else:
+            korean_body = f"[AI 분석 대기 중]\n\n이 기사는 {art['source']} 소스에서 수집되었습니다.\n제목: {art['title']}\n\n자세한 내용은 원문 링크를 확인하세요."
+
+    if ai_data:
+        impact = ai_data.get('impact_score', 5)
+        sentiment = ai_data.get('market_sentiment', 'NEUTRAL')
+        insight = ai_data.get('actionable_insight', '정보 없음')
+        assets = ai_data.get('related_assets', [])
+        status = "shared" if shared else "analysed"
+    else:
+        # Local relevance model estimate beats a flat default when available
+        estimate = art.get('local_estimate') or {}
+        impact = estimate.get('impact_score', 5)
+        sentiment = estimate.get('market_sentiment', 'NEUTRAL')
+        if art.get('prescore_skipped'):
+            insight = "로컬 관련도 모델 추정치 - 시장 영향도가 낮아 AI 분석을 생략했습니다."
+            status = "local"
+        else:
+            insight = "AI 분석 대기 중 - Gemini API 키를 설정하면 한국어 번역 및 투자 인사이트를 제공합니다."
+            status = "pending"
+        assets = []
+
+    return {
+        "id": art['id'],
+        "meta_data": {
+            "source_name": art['source'],
+            "original_url": art['link'],
+            "cluster_id": art.get('cluster_id'),
+            "published_at": datetime.now(pytz.utc), # Force Freshness
+            "analyzed_at": datetime.now(pytz.utc),
+            # analysed / shared (cluster analysis) / pending (fallback, in the re-analysis backlog) / local (pre-score skipped)
+            "analysis_status": status
+        },
+        "content": {
+            "original_title": art['title'],
+            "korean_title": korean_title,
+            "korean_body": korean_body,
+        },
+        "intelligence": {
+            "impact_score": impact,
+            "market_sentiment": sentiment,
+            "actionable_insight": insight,
+            "related_assets": assets
+        }
+    }
+
+def save_article(db, doc_data):
+    if "MockDB" in str(type(db)):
+        print(f"[💾 NEWS SAVE] {doc_data['content']['korean_title']} (Impact: {doc_data['intelligence']['impact_score']})")
+    else:
+        db.collection('investment_insights').document(doc_data['id']).set(doc_data)
+    insight_buckets.add(doc_data)
+    news_digest.add(doc_data)
 
 def fetch_and_save_calendar(db):
     """
@@ -218,7 +529,7 @@ def fetch_and_save_calendar(db):
     try:
         # Use session to handle cookies automatically
         session = requests.Session()
-        resp = session.get(url, headers=headers, timeout=20)
+        resp = http_cache.get(url, kind="calendar", headers=headers, timeout=20, session=session)
         
         if resp.status_code != 200:
             logger.error(f"HTTP Error: {resp.status_code}")
@@ -318,11 +629,13 @@ def fetch_and_save_calendar(db):
                     "country": country_val,
                     "title": title_val,
                     "importance": imp,
-                    "actual": str(act),
                     "forecast": str(fore),
                     "previous": str(prev),
                     "updated_at": firestore.SERVER_TIMESTAMP
                 }
+                # An empty actual from a stale page must not erase a value calendar_watcher.py already wrote
+                if act:
+                    data["actual"] = str(act)
                 
                 if "MockDB" in str(type(db)):
                     print(f"[📅 CALENDAR] {time_val} [{country_val}] {title_val} (Imp: {imp}) Act:{act}")
@@ -344,8 +657,29 @@ def fetch_and_save_calendar(db):
     except Exception as e:
         logger.error(f"Calendar Crawler Failed: {e}")
 
+def finish_run(report, deadline, lease):
+    """Log and persist the run report (including how much work was deferred), then release the lease."""
+    report["retention"] = retention.join(timeout=max(1.0, deadline.remaining()))
+    report["reanalysis"] = reanalysis.join(timeout=max(1.0, deadline.remaining()))
+    lease.release()
+    report["duration_seconds"] = round(deadline.elapsed(), 1)
+    report["skipped_phases"] = deadline.skipped
+    report["finished_at"] = datetime.now(pytz.utc).isoformat()
+    save_state("run_report", report, worker=True)
+    logger.info(
+        f"📋 Run report: {report['new']} new, {report['analysed']} analysed, {report['shared']} shared, "
+        f"{report['local']} local, {report['fallback']} fallback, {report['deferred']} deferred "
+        f"in {report['duration_seconds']}s" + (f" (skipped: {', '.join(deadline.skipped)})" if deadline.skipped else "")
+    )
+
 def main():
     logger.info("🚀 Starting PURE REAL DATA Engine (Local Test Mode)...")
+    deadline = Deadline()
+    profiling.mark("init")
+    report = {
+        "started_at": datetime.now(pytz.utc).isoformat(), "shard": SHARD_INDEX,
+        "fetched": 0, "new": 0, "analysed": 0, "shared": 0, "local": 0, "fallback": 0, "deferred": 0
+    }
     
     # --- CREDENTIAL CHECK ---
     db = None
@@ -368,97 +702,104 @@ def main():
                 return MockDoc()
         db = MockDB()
 
-    # 1. News Phase
+    # Overlap guard: a run still going from the previous cron tick owns this shard
+    lease = RunLease(db, f"news-shard-{SHARD_INDEX}")
+    sharing = not lease.acquire()
+    if sharing:
+        holder = lease.holder() or {}
+        if LEASE_MODE != "share":
+            logger.warning(f"🔒 Another run ({holder.get('owner', '?')}) holds the lease for shard {SHARD_INDEX}. Exiting.")
+            return
+        logger.info(f"🔒 Another run ({holder.get('owner', '?')}) is active; processing only unclaimed articles")
+    report["lease"] = "shared" if sharing else "held"
+
+    # Expired insights are cleaned up in the background for a fixed time slice (one worker only)
+    if SHARD_INDEX == 0 and not sharing:
+        retention.start(db)
+
+    # 1. News Phase: fetch -> dedup -> enrich -> analyse -> save, streamed per feed.
+    # Feeds download in a background thread while earlier articles are deduped, enriched and
+    # pre-scored; LLM candidates wait in a bounded priority heap until fetching ends.
     logger.info("--- Phase 1: Real News Fetching ---")
-    all_articles = fetch_feeds()
-    
-    # Filter out already existing articles (if DB is real)
-    new_articles = filter_new_articles(db, all_articles)
-    logger.info(f"📰 Fetched {len(new_articles)} NEW articles to process.")
+    profiling.mark("news")
+    # Per-source files, so a change in worker count only loses the marks of the sources that moved
+    high_water = load_keyed("feed_high_water", select_feeds(RSS_FEEDS), legacy_name="feed_high_water")
+    # Articles deferred by the previous run's token budget go first
+    carried, expired = analysis_queue.load_carried()
+    chunks = pipeline.background(iter_feeds(high_water, deadline, report), PIPELINE_QUEUE_SIZE, name="fetch")
+    chunks = pipeline.unique(itertools.chain([carried], chunks))
+    # One dedup window per run: each hour bucket is read at most once
+    window = insight_buckets.DedupWindow(db)
+    chunks = dedup_stage(db, chunks, lease, report, window)
+    chunks = pipeline.background(enrich_stage(chunks, deadline), PIPELINE_QUEUE_SIZE, name="dedup-enrich")
+    deferred, budget_left = analyse_and_save(db, model, chunks, deadline, report)
+    logger.info(f"📰 Fetched {report['fetched']} articles, {report['new']} NEW processed ({len(carried)} carried over).")
 
-    BATCH_SIZE = 5
-    for i in range(0, len(new_articles), BATCH_SIZE):
-        batch_arts = new_articles[i:i+BATCH_SIZE]
-        
-        # Try AI Analysis if model exists
-        ai_results = {} # Map ID -> Result
-        if model:
-            try:
-                results_list = analyze_batch(model, batch_arts)
-                for res in results_list:
-                    idx = res.get('item_index')
-                    if idx is not None and idx < len(batch_arts):
-                        art_id = batch_arts[idx]['id']
-                        ai_results[art_id] = res
-            except Exception as e:
-                logger.error(f"Batch Analysis Error: {e}")
-        else:
-             logger.warning("⚠️ Skipping AI Analysis (No API Key). Using metadata only.")
+    # Articles that can no longer be carried (too old, or past the queue limit) are saved as
+    # pending fallbacks: the high-water marks below move past them, so no later run refetches them
+    deferred, overflow = analysis_queue.split_carry(deferred)
+    dropped = filter_new_articles(db, expired, window) + overflow
+    if dropped:
+        logger.info(f"📥 Saving {len(dropped)} articles that left the carry queue as pending fallbacks")
+        save_fallbacks(db, dropped, report)
 
-        # Save EACH article to DB (AI or Fallback)
-        for art in batch_arts:
-            art_id = art['id']
-            ai_data = ai_results.get(art_id)
-            
-            # Prepare Data
-            if ai_data:
-                korean_title = ai_data.get('korean_title', art['title'])
-                korean_body = ai_data.get('korean_body', '번역 불가')
-                impact = ai_data.get('impact_score', 5)
-                sentiment = ai_data.get('market_sentiment', 'NEUTRAL')
-                insight = ai_data.get('actionable_insight', '정보 없음')
-                assets = ai_data.get('related_assets', [])
-            else:
-                # FALLBACK - Use RSS description/summary as body content
-                # Even without AI, provide actual article content to users
-                korean_title = art['title']  # Original English title
-                
-                # Use RSS description if available, otherwise provide helpful message
-                rss_description = art.get('full_content', '').strip()
-                if rss_description and len(rss_description) > 20:
-                    korean_body = f"{rss_description}\n\n[AI 번역 대기 중 - 원문 기사입니다. 자세한 내용은 원문 링크를 확인하세요.]"
-                else:
-                    korean_body = f"[AI 분석 대기 중]\n\n이 기사는 {art['source']} 소스에서 수집되었습니다.\n제목: {art['title']}\n\n자세한 내용은 원문 링크를 확인하세요."
-                
-                impact = 5
-                sentiment = 'NEUTRAL'
-                insight = "AI 분석 대기 중 - Gemini API 키를 설정하면 한국어 번역 및 투자 인사이트를 제공합니다."
-                assets = []
-
-            doc_data = {
-                "id": art_id,
-                "meta_data": {
-                    "source_name": art['source'],
-                    "published_at": datetime.now(pytz.utc), # Force Freshness
-                    "analyzed_at": datetime.now(pytz.utc)
-                },
-                "content": {
-                    "original_title": art['title'],
-                    "korean_title": korean_title,
-                    "korean_body": korean_body,
-                },
-                "intelligence": {
-                    "impact_score": impact,
-                    "market_sentiment": sentiment,
-                    "actionable_insight": insight,
-                    "related_assets": assets
-                }
-            }
-            
-            # Save
-            if "MockDB" in str(type(db)):
-                print(f"[💾 NEWS SAVE] {korean_title} (Impact: {impact})")
-            else:
-                db.collection('investment_insights').document(art_id).set(doc_data)
-        
-        time.sleep(1)
+    profiling.mark("persist")
+    # Materialised top-N digests for the app, updated from this run's saved articles only
+    try:
+        news_digest.flush(db)
+    except Exception as e:
+        logger.error(f"News digest update failed: {e}")
+    try:
+        insight_buckets.flush(db)
+    except Exception as e:
+        logger.error(f"Bucket index update failed: {e}")
+    try:
+        reanalysis.flush(db)
+    except Exception as e:
+        logger.error(f"Re-analysis backlog update failed: {e}")
+
+    if model:
+        model.log_summary()
+
+    # Advance high-water marks only after this run's articles are saved or queued
+    analysis_queue.save_carried(deferred)
+    lease.release_claims()
+    report["deferred"] = len(deferred)
+    save_keyed("feed_high_water", high_water)
+
+    for host, rec in host_health.summary():
+        logger.info(f"🔌 Cooling off: {host} ({rec['consecutive_failures']} failures, last: {rec.get('last_error', '')})")
+    host_health.flush()
+
+    # Articles saved with fallback content are re-analysed in the background with what is left
+    # of this run's LLM budget, while the calendar and indicators are collected (one worker only)
+    if SHARD_INDEX == 0 and not sharing:
+        reanalysis.start(db, model, analyze_batch, budget_left, deadline, body_tokens=PROMPT_BODY_TOKENS)
+
+    # Calendar and ECOS are shared by all shards; only the first worker runs them
+    if SHARD_INDEX != 0 or sharing:
+        if SHARD_INDEX != 0:
+            logger.info(f"Shard {SHARD_INDEX}/{SHARD_COUNT}: skipping calendar and indicators (owned by shard 0)")
+        else:
+            logger.info("Skipping calendar and indicators (the lease holder collects them)")
+        finish_run(report, deadline, lease)
+        logger.info("Done.")
+        return
 
     # 2. Calendar
-    logger.info("--- Phase 2: Real Calendar Fetching ---")
-    fetch_and_save_calendar(db)
+    if deadline.allows(PHASE_SECONDS["calendar"], what="calendar"):
+        logger.info("--- Phase 2: Real Calendar Fetching ---")
+        profiling.mark("calendar")
+        fetch_and_save_calendar(db)
     
     # 3. Economic Indicators (ECOS)
+    if not deadline.allows(PHASE_SECONDS["ecos"], what="economic indicators"):
+        finish_run(report, deadline, lease)
+        logger.info("Done.")
+        return
     logger.info("--- Phase 3: Economic Indicators Fetching ---")
+    profiling.mark("ecos")
+    indicators_data = []
     try:
         # Import ecos_crawler module
         import sys
@@ -499,8 +840,22 @@ def main():
             
     except Exception as e:
         logger.error(f"Economic indicators collection failed: {e}")
+
+    # 4. Derived indicators (spreads, moving averages, momentum) from the stored history
+    if indicators_data and deadline.allows(PHASE_SECONDS["derived"], what="derived indicators"):
+        profiling.mark("derived")
+        try:
+            import derived_indicators
+            derived_indicators.update(db)
+        except Exception as e:
+            logger.error(f"Derived indicators failed: {e}")
     
+    finish_run(report, deadline, lease)
     logger.info("Done.")
 
 if __name__ == "__main__":
-    main()
+    profiling.enable_from_argv("main")
+    try:
+        main()
+    finally:
+        profiling.finish()
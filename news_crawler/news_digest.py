@@ -0,0 +1,158 @@
+"""
+뉴스 다이제스트 문서 (앱 1회 읽기용 materialized view)
+앱의 NewsRepository는 피드를 만들 때마다 investment_insights를 조회/정렬하므로 화면 로딩마다 문서 읽기가 많음
+실행이 끝날 때 이번 실행에서 저장한 기사만으로 다이제스트 문서를 증분 갱신 (전체 컬렉션 스캔 없음)
+
+news_digests/
+  hour_<YYYYMMDDHH>    시간별 impact_score 상위 N (UTC)
+  day_<YYYYMMDD>       일별 impact_score 상위 N (UTC)
+  sentiment_<POSITIVE|NEGATIVE|NEUTRAL>  최근 ROLLING_HOURS 시간 상위 N
+  asset_<slug>         관련 자산별 최근 ROLLING_HOURS 시간 상위 N
+  index                최신 시간/일 키, 자산 다이제스트 목록
+
+각 문서는 기사 요약 항목(items)만 담고 DIGEST_SIZE개로 제한
+여러 샤드가 동시에 갱신하므로 읽기-병합-쓰기는 하나의 트랜잭션으로 처리
+"""
+
+import re
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import pytz
+from firebase_admin import firestore
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "news_digests"
+
+DIGEST_SIZE = 30
+ROLLING_HOURS = 48
+MAX_ASSETS_PER_ARTICLE = 3
+MAX_INDEXED_ASSETS = 100
+INSIGHT_CHARS = 140
+
+_lock = threading.Lock()
+_pending = {}
+
+def _asset_slug(asset):
+    slug = re.sub(r"[^0-9a-z]+", "_", str(asset).lower()).strip("_")
+    return slug[:40]
+
+def _item(doc):
+    """investment_insights 문서 -> 다이제스트 항목 (앱 목록 표시에 필요한 필드만)"""
+    meta = doc["meta_data"]
+    intel = doc["intelligence"]
+    analyzed_at = meta.get("analyzed_at") or datetime.now(pytz.utc)
+    return {
+        "id": doc["id"],
+        "korean_title": doc["content"]["korean_title"],
+        "source_name": meta.get("source_name", ""),
+        "original_url": meta.get("original_url", ""),
+        "cluster_id": meta.get("cluster_id"),
+        "analyzed_at": analyzed_at.isoformat(),
+        "impact_score": intel.get("impact_score", 5),
+        "market_sentiment": intel.get("market_sentiment", "NEUTRAL"),
+        "related_assets": list(intel.get("related_assets", []))[:MAX_ASSETS_PER_ARTICLE],
+        "actionable_insight": (intel.get("actionable_insight") or "")[:INSIGHT_CHARS]
+    }
+
+def digest_keys(item):
+    """기사가 들어갈 다이제스트 문서 ID 목록"""
+    ts = datetime.fromisoformat(item["analyzed_at"]).astimezone(pytz.utc)
+    keys = [f"hour_{ts.strftime('%Y%m%d%H')}", f"day_{ts.strftime('%Y%m%d')}", f"sentiment_{item['market_sentiment']}"]
+    for asset in item["related_assets"]:
+        slug = _asset_slug(asset)
+        if slug:
+            keys.append(f"asset_{slug}")
+    return keys
+
+def add(doc):
+    """저장한 기사 문서 등록 (flush 때 반영). 같은 기사가 다시 저장되면 최신 내용으로 교체"""
+    try:
+        item = _item(doc)
+    except (KeyError, TypeError):
+        return
+    with _lock:
+        _pending[item["id"]] = item
+
+def merge_items(existing, new_items, cutoff=None):
+    """
+    기존 항목 + 새 항목 병합 -> impact_score, 최신순 상위 DIGEST_SIZE
+
+    cutoff(ISO 문자열)보다 오래된 항목은 제외 (rolling 다이제스트)
+    """
+    by_id = {it["id"]: it for it in existing}
+    for it in new_items:
+        by_id[it["id"]] = it
+    items = [it for it in by_id.values() if cutoff is None or it["analyzed_at"] >= cutoff]
+    items.sort(key=lambda it: (it["impact_score"], it["analyzed_at"]), reverse=True)
+    return items[:DIGEST_SIZE]
+
+def flush(db):
+    """
+    등록된 기사로 다이제스트 문서 증분 갱신
+
+    Returns:
+        갱신한 다이제스트 문서 수
+    """
+    with _lock:
+        items = list(_pending.values())
+        _pending.clear()
+    if not items:
+        return 0
+
+    groups = {}
+    asset_names = {}
+    for it in items:
+        for key in digest_keys(it):
+            groups.setdefault(key, []).append(it)
+        for asset in it["related_assets"]:
+            if _asset_slug(asset):
+                asset_names[_asset_slug(asset)] = asset
+
+    cutoff = (datetime.now(pytz.utc) - timedelta(hours=ROLLING_HOURS)).isoformat()
+    latest = max(it["analyzed_at"] for it in items)
+    latest_ts = datetime.fromisoformat(latest).astimezone(pytz.utc)
+
+    if "MockDB" in str(type(db)):
+        for key, group in sorted(groups.items()):
+            top = merge_items([], group)
+            print(f"[📰 DIGEST] {key}: {len(top)} items (top impact {top[0]['impact_score']})")
+        return len(groups)
+
+    col = db.collection(COLLECTION_NAME)
+    refs = {key: col.document(key) for key in groups}
+    index_ref = col.document("index")
+
+    @firestore.transactional
+    def txn(transaction):
+        snaps = {s.id: s for s in transaction.get_all(list(refs.values()) + [index_ref])}
+        for key, group in groups.items():
+            snap = snaps.get(key)
+            existing = snap.to_dict().get("items", []) if snap is not None and snap.exists else []
+            rolling = key.startswith(("sentiment_", "asset_"))
+            kind, _, value = key.partition("_")
+            transaction.set(refs[key], {
+                "kind": kind,
+                "key": value,
+                "items": merge_items(existing, group, cutoff if rolling else None),
+                "updated_at": firestore.SERVER_TIMESTAMP
+            })
+
+        index_snap = snaps.get("index")
+        index = index_snap.to_dict() if index_snap is not None and index_snap.exists else {}
+        assets = index.get("assets", {})
+        for slug, name in asset_names.items():
+            assets[slug] = {"name": name, "updated_at": latest}
+        assets = dict(sorted(assets.items(), key=lambda kv: kv[1]["updated_at"], reverse=True)[:MAX_INDEXED_ASSETS])
+        transaction.set(index_ref, {
+            "latest_hour": max(index.get("latest_hour", ""), latest_ts.strftime('%Y%m%d%H')),
+            "latest_day": max(index.get("latest_day", ""), latest_ts.strftime('%Y%m%d')),
+            "assets": assets,
+            "updated_at": firestore.SERVER_TIMESTAMP
+        })
+
+    txn(db.transaction())
+    logger.info(f"📰 News digests: {len(groups)} documents updated from {len(items)} articles")
+    return len(groups)
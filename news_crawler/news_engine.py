@@ -1,7 +1,6 @@
 import os
 import json
 import logging
-import feedparser
 import firebase_admin
 from firebase_admin import credentials
 from firebase_admin import firestore
@@ -10,9 +9,13 @@ from datetime import datetime, timedelta
 import pytz
 import hashlib
 import time
-import requests
 from bs4 import BeautifulSoup
 from dateutil import parser as date_parser
+import http_cache
+import profiling
+from feed_reader import iter_feed_entries
+from gnews_resolver import resolve_links
+from url_canon import article_id
 
 # --- Configuration ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -80,19 +83,22 @@ def fetch_feeds():
     articles = []
     for source, url in RSS_FEEDS.items():
         try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:10]:
-                if not hasattr(entry, 'title'): continue
+            for entry in iter_feed_entries(url, limit=10):
+                if not entry['title']: continue
                 
-                pub_str = getattr(entry, 'published', str(datetime.now()))
                 articles.append({
-                    "id": hashlib.md5(entry.link.encode()).hexdigest(),
-                    "title": entry.title,
-                    "link": entry.link,
-                    "published": pub_str,
+                    "title": entry['title'],
+                    "link": entry['link'],
+                    "published": entry['published'],
                     "source": source
                 })
         except Exception: pass
+
+    # Google News 래퍼 링크 -> 원문 URL, ID는 정규화된 원문 URL 기준
+    resolved = resolve_links([a['link'] for a in articles])
+    for a in articles:
+        a['link'] = resolved.get(a['link'], a['link'])
+        a['id'] = article_id(a['link'])
     return articles
 
 def analyze_batch(model, articles):
@@ -110,7 +116,7 @@ def fetch_and_save_calendar(db):
         headers = {'User-Agent': 'Mozilla/5.0', 'Accept-Language': 'ko-KR'}
         items = []
         try:
-            resp = requests.get("https://ko.tradingeconomics.com/calendar", headers=headers, timeout=20)
+            resp = http_cache.get("https://ko.tradingeconomics.com/calendar", kind="calendar", headers=headers, timeout=20)
             soup = BeautifulSoup(resp.content, 'html.parser')
             table = soup.select_one('#calendar')
             if table:
@@ -133,12 +139,14 @@ def fetch_and_save_calendar(db):
                 if not title: continue
                 
                 eid = hashlib.md5(f"{today_str}-{title}-{time_val}".encode()).hexdigest()
-                batch.set(db.collection('economic_calendar').document(eid), {
+                event = {
                     "id": eid, "date": today_str, "time": time_val, "country": country, "title": title,
                     "importance": int(row.get('data-importance', '1') or 1),
-                    "actual": row.get('data-actual', ''), "forecast": row.get('data-forecast', ''),
+                    "forecast": row.get('data-forecast', ''),
                     "previous": row.get('data-previous', ''), "updated_at": firestore.SERVER_TIMESTAMP
-                }, merge=True)
+                }
+                if row.get('data-actual'): event["actual"] = row.get('data-actual')
+                batch.set(db.collection('economic_calendar').document(eid), event, merge=True)
             except: continue
         
         if "ConsoleOutputDB" not in str(type(db)): batch.commit()
@@ -165,10 +173,12 @@ def main():
         db = ConsoleOutputDB()
 
     # 1. Fetch
+    profiling.mark("fetch")
     news = fetch_feeds()
     print(f"📰 Fetched {len(news)} articles.")
 
     # 2. Analyze
+    profiling.mark("analyze")
     ai_results = {}
     if model and news:
         try:
@@ -179,6 +189,7 @@ def main():
         except Exception as e: print(f"AI Error: {e}")
 
     # 3. Save to V2 Collection
+    profiling.mark("save")
     for i, art in enumerate(news):
         try:
             pub_dt = date_parser.parse(art['published'])
@@ -194,6 +205,7 @@ def main():
             "id": art['id'],
             "meta_data": { 
                 "source_name": art['source'], 
+                "original_url": art['link'],
                 "published_at": pub_dt, 
                 "analyzed_at": datetime.now(pytz.utc) 
             },
@@ -216,8 +228,13 @@ def main():
             db.collection(COLLECTION_NAME).document(art['id']).set(doc_data)
 
     # 4. Calendar
+    profiling.mark("calendar")
     fetch_and_save_calendar(db)
     print("✅ Done.")
 
 if __name__ == "__main__":
-    main()
+    profiling.enable_from_argv("news_engine")
+    try:
+        main()
+    finally:
+        profiling.finish()
@@ -0,0 +1,76 @@
+"""
+스트리밍 파이프라인 유틸리티
+뉴스 수집 단계(fetch -> normalise -> dedup -> analyse -> persist)를 전체 목록 대신
+청크(피드 단위 기사 목록) 제너레이터로 연결하기 위함
+
+- background(): 앞 단계를 별도 스레드에서 실행하고 크기 제한 큐로 넘김
+  (뒤 단계가 느리면 앞 단계가 대기 -> 메모리는 큐 크기만큼만 사용)
+- unique(): 청크를 넘어 같은 ID의 기사 제거
+"""
+
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+def background(iterable, maxsize=4, name="pipeline-stage"):
+    """
+    iterable을 백그라운드 스레드에서 소비하며 결과를 크기 maxsize인 큐로 전달
+
+    앞 단계에서 발생한 예외는 소비하는 쪽에서 다시 발생
+    """
+    q = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item):
+        # 소비하는 쪽이 중단되면 블록된 채로 남지 않도록 주기적으로 확인
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as e:
+            put(_Failure(e))
+            return
+        put(_DONE)
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+
+def unique(chunks, seen=None):
+    """청크 스트림에서 이미 나온 ID의 기사 제거 (빈 청크는 건너뜀)"""
+    seen = set() if seen is None else seen
+    for chunk in chunks:
+        fresh = []
+        for art in chunk:
+            if art['id'] not in seen:
+                seen.add(art['id'])
+                fresh.append(art)
+        if fresh:
+            yield fresh
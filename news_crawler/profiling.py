@@ -0,0 +1,165 @@
+"""
+실행 프로파일링 (--profile 플래그 또는 CRAWLER_PROFILE=1)
+실행이 느릴 때 시간이 BeautifulSoup, feedparser, json.loads, 네트워크 대기 중 어디에 쓰이는지 확인하기 위함
+
+단계(phase)마다
+- cProfile (결정적, 메인 스레드) -> <NN>-<phase>.pstats
+- 스택 샘플링 (모든 스레드, SAMPLE_INTERVAL 간격) -> <NN>-<phase>.collapsed
+  flamegraph.pl / speedscope에서 바로 열 수 있는 "frame;frame;frame count" 형식
+- tracemalloc 최대 메모리
+결과는 .state/profiles/<script>-<시각>/ (CRAWLER_PROFILE_DIR로 변경 가능)에 저장, summary.json에 단계별 요약
+
+사용:
+    profiling.enable_from_argv("main")
+    profiling.mark("fetch")      # 이전 단계를 끝내고 새 단계 시작
+    ...
+    profiling.finish()
+"""
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from datetime import datetime
+from collections import Counter
+
+from crawler_state import state_dir
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 15
+
+_session = None
+
+class _Sampler(threading.Thread):
+    """모든 스레드의 스택을 주기적으로 수집 (collapsed stack 집계)"""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.counts = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for t in threading.enumerate():
+                names[t.ident] = t.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, "thread"))
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class _Session:
+    def __init__(self, script, out_dir):
+        self.script = script
+        self.out_dir = out_dir
+        self.phases = []
+        self.current = None
+
+    def start(self, name):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        sampler = _Sampler(SAMPLE_INTERVAL)
+        self.current = {
+            "name": name, "profiler": profiler, "sampler": sampler,
+            "wall": time.perf_counter(), "cpu": time.process_time(),
+            "mem_start": tracemalloc.get_traced_memory()[0]
+        }
+        sampler.start()
+        profiler.enable()
+
+    def stop(self):
+        cur = self.current
+        if cur is None:
+            return
+        cur["profiler"].disable()
+        cur["sampler"].stop()
+        self.current = None
+        wall = time.perf_counter() - cur["wall"]
+        cpu = time.process_time() - cur["cpu"]
+        current, peak = tracemalloc.get_traced_memory()
+
+        prefix = os.path.join(self.out_dir, f"{len(self.phases) + 1:02d}-{cur['name']}")
+        cur["profiler"].dump_stats(prefix + ".pstats")
+        with open(prefix + ".collapsed", 'w', encoding='utf-8') as f:
+            for stack, count in cur["sampler"].counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+        stats = pstats.Stats(cur["profiler"])
+        top = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:TOP_FUNCTIONS]
+        self.phases.append({
+            "phase": cur["name"],
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(cpu, 3),
+            "peak_mb": round(peak / 1024 / 1024, 2),
+            "retained_mb": round((current - cur["mem_start"]) / 1024 / 1024, 2),
+            "samples": sum(cur["sampler"].counts.values()),
+            "top_cumulative": [
+                {"function": f"{func[2]} ({os.path.basename(func[0])}:{func[1]})", "calls": s[1], "cumtime": round(s[3], 4)}
+                for func, s in top
+            ]
+        })
+        logger.info(f"⏱️ [profile] {cur['name']}: {wall:.2f}s wall, {cpu:.2f}s cpu, peak {peak / 1024 / 1024:.1f} MB")
+
+    def finish(self):
+        self.stop()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        with open(os.path.join(self.out_dir, "summary.json"), 'w', encoding='utf-8') as f:
+            json.dump({"script": self.script, "phases": self.phases}, f, ensure_ascii=False, indent=2)
+        logger.info(f"⏱️ [profile] Wrote {len(self.phases)} phase profiles to {self.out_dir}")
+
+def enable(script):
+    """프로파일링 세션 시작"""
+    global _session
+    base = os.environ.get('CRAWLER_PROFILE_DIR') or state_dir("profiles")
+    out_dir = os.path.join(base, f"{script}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+    os.makedirs(out_dir, exist_ok=True)
+    _session = _Session(script, out_dir)
+    logger.info(f"⏱️ Profiling enabled -> {out_dir}")
+
+def enable_from_argv(script):
+    """--profile 인자나 CRAWLER_PROFILE=1 이면 활성화 (인자는 sys.argv에서 제거)"""
+    flag = "--profile" in sys.argv
+    if flag:
+        sys.argv.remove("--profile")
+    if flag or os.environ.get('CRAWLER_PROFILE') == '1':
+        enable(script)
+
+def enabled():
+    return _session is not None
+
+def mark(name):
+    """현재 단계를 끝내고 name 단계 시작 (비활성 시 무시)"""
+    if _session is None:
+        return
+    _session.stop()
+    _session.start(name)
+
+def finish():
+    """마지막 단계 종료 후 summary.json 저장"""
+    global _session
+    if _session is None:
+        return
+    _session.finish()
+    _session = None
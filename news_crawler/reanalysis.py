@@ -0,0 +1,224 @@
+"""
+재분석 백로그 (fallback 내용으로 저장된 기사)
+Gemini가 없거나 실패하면 기사는 "AI 분석 대기 중" 내용으로 저장되고, 이후 filter_new_articles는
+이미 있는 기사로 보므로 다시 분석되지 않음
+
+- 문서의 meta_data.analysis_status: analysed / shared(클러스터 분석 공유) / pending(fallback) / local(사전 점수로 분석 생략) / failed
+- pending 기사는 analysis_backlog 컬렉션에 프롬프트에 필요한 필드와 함께 등록 (add -> flush)
+  가져온 기사 본문(article_text)은 프롬프트에 쓰는 토큰 예산만큼 잘라 함께 저장 (기사 캐시 만료와 무관하게 같은 본문으로 재분석)
+- LLM 여유가 있을 때(할당량 circuit 닫힘, 실행 토큰 예산 남음) 백그라운드 스레드에서
+  최신 백로그를 우선순위(analysis_queue.score_article) 순으로 BATCH_SIZE개씩 재분석
+- 분석 결과는 도착하는 대로 investment_insights 문서의 분석 필드만 제자리 갱신(update)하고 백로그에서 삭제
+- MAX_ATTEMPTS번 응답에 빠지면 failed로 표시, MAX_AGE_HOURS보다 오래된 항목은 백로그에서 제거
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import pytz
+from firebase_admin import firestore
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+import analysis_queue
+import news_digest
+import text_clean
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('REANALYSIS', '1') == '1'
+
+COLLECTION_NAME = "analysis_backlog"
+INSIGHTS_COLLECTION = "investment_insights"
+
+BATCH_SIZE = 15           # 실행 중 분석(5개)보다 큰 배치로 호출 수를 줄임
+SCAN_LIMIT = 150          # 한 번에 읽는 최신 백로그 수 (이 안에서 우선순위 정렬)
+MAX_ATTEMPTS = 3
+MAX_AGE_HOURS = 48
+BATCH_SECONDS = 45        # 배치 1회 최악 소요 시간 (실행 deadline 확인용)
+
+# 재분석 프롬프트에 쓰는 필드
+ENTRY_FIELDS = ("id", "title", "link", "published", "source", "full_content", "article_text", "cluster_id")
+
+_lock = threading.Lock()
+_pending = {}
+_thread = None
+_result = {}
+
+def add(art, body_tokens=0):
+    """
+    fallback으로 저장한 기사를 백로그에 등록 (flush 때 기록)
+
+    Args:
+        body_tokens: 프롬프트 본문 토큰 예산 (article_text를 이만큼만 저장, 0이면 저장하지 않음)
+    """
+    entry = {k: art[k] for k in ENTRY_FIELDS if art.get(k)}
+    if entry.get('article_text'):
+        entry['article_text'] = text_clean.compact(entry['article_text'], body_tokens)
+        if not entry['article_text']:
+            del entry['article_text']
+    with _lock:
+        _pending[art['id']] = entry
+
+def flush(db):
+    """
+    등록된 기사를 백로그 문서로 기록
+
+    Returns:
+        기록한 항목 수
+    """
+    with _lock:
+        entries = list(_pending.values())
+        _pending.clear()
+    if not entries:
+        return 0
+    if "MockDB" in str(type(db)):
+        print(f"[🔁 BACKLOG] +{len(entries)} articles pending re-analysis")
+        return len(entries)
+
+    col = db.collection(COLLECTION_NAME)
+    now = datetime.now(pytz.utc)
+    for i in range(0, len(entries), 400):
+        batch = db.batch()
+        for entry in entries[i:i + 400]:
+            batch.set(col.document(entry['id']), dict(entry, saved_at=now, attempts=0))
+        batch.commit()
+    logger.info(f"🔁 Re-analysis backlog: {len(entries)} articles added")
+    return len(entries)
+
+def _prune(db, now):
+    """MAX_AGE_HOURS보다 오래된 백로그 항목 삭제"""
+    cutoff = now - timedelta(hours=MAX_AGE_HOURS)
+    snaps = list(db.collection(COLLECTION_NAME).where(filter=FieldFilter("saved_at", "<", cutoff)).limit(400).stream())
+    if snaps:
+        batch = db.batch()
+        for snap in snaps:
+            batch.delete(snap.reference)
+        batch.commit()
+        logger.info(f"🔁 Re-analysis backlog: dropped {len(snaps)} entries older than {MAX_AGE_HOURS}h")
+
+def load_backlog(db):
+    """최신 백로그 SCAN_LIMIT개를 우선순위 순으로 반환"""
+    query = (db.collection(COLLECTION_NAME)
+             .order_by("saved_at", direction=firestore.Query.DESCENDING)
+             .limit(SCAN_LIMIT))
+    entries = [snap.to_dict() for snap in query.stream()]
+    now = datetime.now(pytz.utc)
+    entries.sort(key=lambda e: analysis_queue.score_article(e, now), reverse=True)
+    return entries
+
+def _analysis_fields(ai_data):
+    """분석 결과 -> 문서 제자리 갱신 필드 (main.build_document의 AI 분기와 같은 기본값)"""
+    return {
+        "content.korean_title": ai_data.get('korean_title'),
+        "content.korean_body": ai_data.get('korean_body', '번역 불가'),
+        "intelligence.impact_score": ai_data.get('impact_score', 5),
+        "intelligence.market_sentiment": ai_data.get('market_sentiment', 'NEUTRAL'),
+        "intelligence.actionable_insight": ai_data.get('actionable_insight', '정보 없음'),
+        "intelligence.related_assets": ai_data.get('related_assets', []),
+        "meta_data.analysis_status": "analysed",
+        "meta_data.reanalysed_at": datetime.now(pytz.utc)
+    }
+
+def _save_result(db, entry, ai_data):
+    """문서 분석 필드 갱신 + 백로그 삭제. 문서가 이미 삭제됐으면(보관 기간 정리) 백로그만 삭제"""
+    fields = _analysis_fields(ai_data)
+    fields["content.korean_title"] = fields["content.korean_title"] or entry['title']
+    batch = db.batch()
+    batch.update(db.collection(INSIGHTS_COLLECTION).document(entry['id']), fields)
+    batch.delete(db.collection(COLLECTION_NAME).document(entry['id']))
+    try:
+        batch.commit()
+    except NotFound:
+        db.collection(COLLECTION_NAME).document(entry['id']).delete()
+        return False
+    news_digest.add({
+        "id": entry['id'],
+        "meta_data": {"source_name": entry.get('source', ''), "original_url": entry.get('link', ''),
+                      "cluster_id": entry.get('cluster_id'), "analyzed_at": fields["meta_data.reanalysed_at"]},
+        "content": {"korean_title": fields["content.korean_title"]},
+        "intelligence": {k.split('.', 1)[1]: v for k, v in fields.items() if k.startswith("intelligence.")}
+    })
+    return True
+
+def _record_miss(db, entry):
+    """응답에 빠진 항목: 시도 횟수 증가, MAX_ATTEMPTS 도달 시 failed 표시 후 백로그에서 제거"""
+    attempts = entry.get('attempts', 0) + 1
+    ref = db.collection(COLLECTION_NAME).document(entry['id'])
+    if attempts < MAX_ATTEMPTS:
+        ref.update({"attempts": attempts})
+        return
+    batch = db.batch()
+    batch.update(db.collection(INSIGHTS_COLLECTION).document(entry['id']), {"meta_data.analysis_status": "failed"})
+    batch.delete(ref)
+    try:
+        batch.commit()
+    except NotFound:
+        ref.delete()
+
+def run(db, model, analyze, budget, deadline, body_tokens=0):
+    """
+    백로그 재분석 (예산/시간/할당량이 허락하는 동안)
+
+    Args:
+        analyze: analyze(model, articles, timeout) -> 분석 항목을 하나씩 반환하는 generator
+        budget: 사용할 수 있는 토큰 예산
+        deadline: 실행 Deadline
+
+    Returns:
+        {"analysed": n, "missed": n, "remaining": 이번에 읽은 백로그 중 남은 수}
+    """
+    _prune(db, datetime.now(pytz.utc))
+    entries = load_backlog(db)
+    selected, _ = analysis_queue.plan_analysis(entries, budget, body_tokens=body_tokens)
+    analysed = missed = 0
+    for i in range(0, len(selected), BATCH_SIZE):
+        if model.circuit_open() or not deadline.allows(BATCH_SECONDS, what="re-analysis"):
+            break
+        batch_entries = selected[i:i + BATCH_SIZE]
+        done = set()
+        for res in analyze(model, batch_entries, timeout=deadline.timeout(90)):
+            idx = res.get('item_index')
+            if not isinstance(idx, int) or not 0 <= idx < len(batch_entries) or idx in done:
+                continue
+            done.add(idx)
+            if _save_result(db, batch_entries[idx], res):
+                analysed += 1
+        if model.circuit_open():
+            break
+        for n, entry in enumerate(batch_entries):
+            if n not in done:
+                _record_miss(db, entry)
+                missed += 1
+
+    if analysed:
+        news_digest.flush(db)
+    logger.info(f"🔁 Re-analysis: {analysed} articles updated, {missed} missing from responses, {len(entries) - analysed} left in backlog window")
+    return {"analysed": analysed, "missed": missed, "remaining": len(entries) - analysed}
+
+def _run_safely(*args, **kwargs):
+    global _result
+    try:
+        _result = run(*args, **kwargs)
+    except Exception as e:
+        logger.error(f"Re-analysis failed: {e}")
+        _result = {"error": str(e)}
+
+def start(db, model, analyze, budget, deadline, body_tokens=0):
+    """LLM 여유가 있으면 백그라운드 스레드로 재분석 시작"""
+    global _thread
+    if not ENABLED or model is None or "MockDB" in str(type(db)):
+        return
+    if model.circuit_open() or budget <= 0:
+        logger.info("🔁 Re-analysis skipped (no LLM capacity left this run)")
+        return
+    _thread = threading.Thread(target=_run_safely, args=(db, model, analyze, budget, deadline, body_tokens), daemon=True)
+    _thread.start()
+
+def join(timeout=None):
+    """백그라운드 재분석 종료 대기, 결과 반환"""
+    if _thread is not None:
+        _thread.join(timeout)
+    return _result
@@ -0,0 +1,203 @@
+"""
+로컬 관련도 사전 점수 모델
+모든 새 기사를 Gemini로 보내지 않도록, 저장된 impact_score 이력으로 학습한 경량 모델로 먼저 점수화
+- 특징: 제목 단어/바이그램 + 소스 이름을 해싱한 TF-IDF
+- 모델: ridge 회귀 (impact_score), one-vs-rest ridge (market_sentiment)
+- 배치 전체를 NumPy 행렬 연산 한 번으로 예측
+임계값 이상인 기사만 analyze_batch로 보내고, 나머지는 로컬 추정치로 저장
+"""
+
+import os
+import re
+import time
+import zlib
+import logging
+
+import numpy as np
+from firebase_admin import firestore
+
+from crawler_state import load_state, save_state, state_dir
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 2 ** 12
+RIDGE_ALPHA = 1.0
+SENTIMENTS = ["POSITIVE", "NEGATIVE", "NEUTRAL"]
+
+# 예측 impact가 이 값 미만이면 LLM 분석 생략
+THRESHOLD = float(os.environ.get('PRESCORE_THRESHOLD', '4.0'))
+
+# 학습 설정
+MIN_TRAIN_SAMPLES = 200
+MAX_TRAIN_SAMPLES = 2000
+RETRAIN_HOURS = 24
+
+# AI 분석 없이 저장된 문서는 학습에서 제외 (impact가 기본값 5라 의미 없음)
+PLACEHOLDER_PREFIXES = ("AI 분석 대기 중", "로컬 관련도 모델")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def _model_path():
+    return os.path.join(state_dir("models"), "relevance_model.npz")
+
+def _tokens(text, source):
+    words = _TOKEN_RE.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return grams + [f"src:{source}"]
+
+def hash_counts(docs):
+    """
+    [(text, source)] -> (n_docs, N_FEATURES) 단어 빈도 행렬 (float32)
+    단어 인덱스는 crc32 해싱이므로 어휘 사전이 필요 없음
+    """
+    rows, cols = [], []
+    for i, (text, source) in enumerate(docs):
+        for tok in _tokens(text, source):
+            rows.append(i)
+            cols.append(zlib.crc32(tok.encode()) % N_FEATURES)
+    counts = np.zeros((len(docs), N_FEATURES), dtype=np.float32)
+    if rows:
+        np.add.at(counts, (np.array(rows), np.array(cols)), 1.0)
+    return counts
+
+def _tfidf(counts, idf):
+    x = np.log1p(counts) * idf
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-9)
+
+def _ridge(x, y, alpha=RIDGE_ALPHA):
+    """
+    ridge 회귀 (dual form: 표본 수 << 특징 수)
+    w = X^T (X X^T + aI)^-1 y
+    """
+    gram = x @ x.T
+    gram[np.diag_indices_from(gram)] += alpha
+    return x.T @ np.linalg.solve(gram, y)
+
+class RelevanceModel:
+    def __init__(self, idf, w_impact, b_impact, w_sentiment, b_sentiment, trained_at, n_samples):
+        self.idf = idf
+        self.w_impact = w_impact
+        self.b_impact = b_impact
+        self.w_sentiment = w_sentiment
+        self.b_sentiment = b_sentiment
+        self.trained_at = trained_at
+        self.n_samples = n_samples
+
+    @classmethod
+    def train(cls, docs, impacts, sentiments):
+        counts = hash_counts(docs)
+        df = (counts > 0).sum(axis=0)
+        idf = (np.log((1 + len(docs)) / (1 + df)) + 1).astype(np.float32)
+        x = _tfidf(counts, idf)
+
+        y = np.asarray(impacts, dtype=np.float32)
+        b_impact = float(y.mean())
+        w_impact = _ridge(x, y - b_impact)
+
+        labels = np.array([[1.0 if s == name else 0.0 for name in SENTIMENTS] for s in sentiments], dtype=np.float32)
+        b_sentiment = labels.mean(axis=0)
+        w_sentiment = _ridge(x, labels - b_sentiment)
+        return cls(idf, w_impact, b_impact, w_sentiment, b_sentiment, time.time(), len(docs))
+
+    def predict(self, docs):
+        """[(text, source)] -> (impact 배열, sentiment 목록)"""
+        x = _tfidf(hash_counts(docs), self.idf)
+        impact = np.clip(x @ self.w_impact + self.b_impact, 1, 10)
+        sentiment_idx = np.argmax(x @ self.w_sentiment + self.b_sentiment, axis=1)
+        return impact, [SENTIMENTS[i] for i in sentiment_idx]
+
+    def save(self):
+        np.savez_compressed(
+            _model_path(), idf=self.idf, w_impact=self.w_impact, b_impact=self.b_impact,
+            w_sentiment=self.w_sentiment, b_sentiment=self.b_sentiment,
+            meta=np.array([self.trained_at, self.n_samples])
+        )
+
+    @classmethod
+    def load(cls):
+        path = _model_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            d = np.load(path)
+            return cls(d['idf'], d['w_impact'], float(d['b_impact']), d['w_sentiment'], d['b_sentiment'],
+                       float(d['meta'][0]), int(d['meta'][1]))
+        except Exception as e:
+            logger.warning(f"Relevance model unreadable: {e}")
+            return None
+
+def _article_doc(art):
+    # 학습 데이터(저장된 original_title)와 같은 입력만 사용
+    return (art.get('title', ''), art.get('source', ''))
+
+def load_training_data(db, limit=MAX_TRAIN_SAMPLES):
+    """investment_insights 최근 문서 중 AI 분석된 것만 학습 데이터로 사용"""
+    docs, impacts, sentiments = [], [], []
+    query = (db.collection('investment_insights')
+             .order_by('meta_data.analyzed_at', direction=firestore.Query.DESCENDING)
+             .limit(limit))
+    for snap in query.stream():
+        d = snap.to_dict() or {}
+        intel = d.get('intelligence', {})
+        if str(intel.get('actionable_insight', '')).startswith(PLACEHOLDER_PREFIXES):
+            continue
+        try:
+            impact = float(intel.get('impact_score'))
+        except (TypeError, ValueError):
+            continue
+        title = d.get('content', {}).get('original_title', '')
+        if not title:
+            continue
+        docs.append((title, d.get('meta_data', {}).get('source_name', '')))
+        impacts.append(impact)
+        sentiments.append(intel.get('market_sentiment', 'NEUTRAL'))
+    return docs, impacts, sentiments
+
+def get_model(db):
+    """저장된 모델 반환, 오래됐으면 재학습. 학습 데이터가 부족하면 None"""
+    model = RelevanceModel.load()
+    if model and time.time() - model.trained_at < RETRAIN_HOURS * 3600:
+        return model
+    if "MockDB" in str(type(db)):
+        return model
+    # 학습 실패/데이터 부족 시에도 매 실행마다 컬렉션을 다시 읽지 않도록 시도 시각 기록
+    meta = load_state("relevance_model_meta")
+    if time.time() - meta.get("last_attempt", 0) < RETRAIN_HOURS * 3600:
+        return model
+    save_state("relevance_model_meta", {"last_attempt": time.time()})
+    try:
+        docs, impacts, sentiments = load_training_data(db)
+        if len(docs) < MIN_TRAIN_SAMPLES:
+            logger.info(f"Relevance model: only {len(docs)} labelled documents, pre-scoring disabled")
+            return model
+        model = RelevanceModel.train(docs, impacts, sentiments)
+        model.save()
+        logger.info(f"🧮 Relevance model retrained on {len(docs)} documents")
+    except Exception as e:
+        logger.warning(f"Relevance model training failed: {e}")
+    return model
+
+def prescore(db, articles, threshold=THRESHOLD):
+    """
+    기사 배치 사전 점수화
+
+    모든 기사에 'local_estimate' ({impact_score, market_sentiment}) 추가
+
+    Returns:
+        (LLM 분석 대상, 로컬 추정치로 저장할 기사)
+    """
+    if not articles:
+        return [], []
+    model = get_model(db)
+    if model is None:
+        return articles, []
+
+    impact, sentiment = model.predict([_article_doc(a) for a in articles])
+    keep, skip = [], []
+    for art, score, sent in zip(articles, impact.tolist(), sentiment):
+        art['local_estimate'] = {"impact_score": int(round(score)), "market_sentiment": sent}
+        (keep if score >= threshold else skip).append(art)
+    if skip:
+        logger.info(f"🧮 Pre-scoring: {len(keep)} to LLM, {len(skip)} below {threshold} saved with local estimates")
+    return keep, skip
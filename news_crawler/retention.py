@@ -0,0 +1,156 @@
+"""
+investment_insights 보관 기간 관리 (retention / compaction)
+매 실행마다 문서가 추가되기만 하므로 컬렉션 크기, 인덱스 저장량, 전체 조회 비용이 계속 증가
+- RETENTION_DAYS보다 오래된 문서 삭제
+- LOW_IMPACT_DAYS보다 오래되고 impact_score가 LOW_IMPACT_THRESHOLD 미만인 문서는 더 일찍 삭제
+- 만료 조건 자체를 인덱스 쿼리로 조회하므로 보존할 문서는 읽지 않음 (삭제한 만큼만 읽기 비용)
+  1) meta_data.analyzed_at < 보관 기한 (단일 필드 인덱스)
+  2) intelligence.impact_score < 기준 AND meta_data.analyzed_at < 낮은 영향도 기한
+     (복합 인덱스 필요: intelligence.impact_score ASC, meta_data.analyzed_at ASC)
+- 조회한 문서는 모두 삭제되므로 cursor 없이 매번 첫 페이지를 다시 조회
+- 삭제는 청크(BATCH_LIMIT)별 batch를 병렬 커밋
+- RETENTION_ARCHIVE=1 이면 삭제 전 로컬 gzip JSONL로 보관 (.state/archive/)
+- 백그라운드 스레드에서 실행당 TIME_SLICE초만 작업, 남은 문서는 다음 실행에서 이어서 삭제
+- 시간 버킷 레이아웃(BUCKET_LAYOUT=1)이면 만료된 시간 버킷의 ID 목록으로 먼저 삭제 (insight_buckets.py)
+"""
+
+import os
+import gzip
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import pytz
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+import insight_buckets
+from crawler_state import save_state, state_dir
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "retention"
+COLLECTION_NAME = "investment_insights"
+
+RETENTION_DAYS = int(os.environ.get('RETENTION_DAYS', '30'))           # 0이면 비활성
+LOW_IMPACT_DAYS = int(os.environ.get('RETENTION_LOW_IMPACT_DAYS', '7'))
+LOW_IMPACT_THRESHOLD = float(os.environ.get('RETENTION_LOW_IMPACT_THRESHOLD', '4'))
+ARCHIVE = os.environ.get('RETENTION_ARCHIVE', '0') == '1'
+TIME_SLICE = float(os.environ.get('RETENTION_TIME_SLICE', '30'))
+
+PAGE_SIZE = 300
+BATCH_LIMIT = 400
+DELETE_WORKERS = 4
+
+_thread = None
+_result = {}
+
+def _archive(docs):
+    """삭제할 문서를 날짜별 gzip JSONL 파일에 추가"""
+    path = os.path.join(state_dir("archive"), f"insights-{datetime.now(pytz.utc).strftime('%Y%m%d')}.jsonl.gz")
+    with gzip.open(path, 'at', encoding='utf-8') as f:
+        for snap in docs:
+            f.write(json.dumps(dict(snap.to_dict(), id=snap.id), ensure_ascii=False, default=str) + "\n")
+
+def _delete_chunks(db, refs):
+    """BATCH_LIMIT 단위 batch를 병렬 커밋"""
+    chunks = [refs[i:i + BATCH_LIMIT] for i in range(0, len(refs), BATCH_LIMIT)]
+
+    def commit(chunk):
+        batch = db.batch()
+        for ref in chunk:
+            batch.delete(ref)
+        batch.commit()
+        return len(chunk)
+
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as pool:
+        return sum(pool.map(commit, chunks))
+
+def _expired_queries(db, now):
+    """만료 문서만 반환하는 쿼리 목록 (보관 기한 초과, 낮은 영향도 기한 초과)"""
+    col = db.collection(COLLECTION_NAME)
+    queries = [
+        col.where(filter=FieldFilter("meta_data.analyzed_at", "<", now - timedelta(days=RETENTION_DAYS)))
+           .order_by("meta_data.analyzed_at")
+    ]
+    if LOW_IMPACT_DAYS < RETENTION_DAYS:
+        queries.append(
+            col.where(filter=FieldFilter("intelligence.impact_score", "<", LOW_IMPACT_THRESHOLD))
+               .where(filter=FieldFilter("meta_data.analyzed_at", "<", now - timedelta(days=LOW_IMPACT_DAYS)))
+               .order_by("intelligence.impact_score")
+               .order_by("meta_data.analyzed_at")
+        )
+    return queries
+
+def run(db, time_slice=TIME_SLICE):
+    """
+    time_slice초 동안 만료 문서 정리
+
+    Returns:
+        {"scanned": n, "deleted": n, "complete": 만료 문서를 모두 삭제했는지}
+    """
+    started = time.time()
+    now = datetime.now(pytz.utc)
+    retention_cutoff = now - timedelta(days=RETENTION_DAYS)
+    scanned = deleted = 0
+    fields = None if ARCHIVE else ["meta_data.analyzed_at"]
+
+    # 버킷 경로: 보관 기간이 지난 시간 버킷의 기사를 조회 없이 바로 삭제
+    if insight_buckets.ENABLED:
+        while time.time() - started < time_slice:
+            buckets = insight_buckets.expired_hours(db, retention_cutoff)
+            if not buckets:
+                insight_buckets.drop_days_before(db, retention_cutoff)
+                break
+            refs = [db.collection(COLLECTION_NAME).document(i) for b in buckets for i in b.to_dict().get("ids", [])]
+            if ARCHIVE:
+                _archive([snap for snap in db.get_all(refs) if snap.exists])
+            _delete_chunks(db, refs + [b.reference for b in buckets])
+            deleted += len(refs)
+
+    queries = _expired_queries(db, now)
+    while queries and time.time() - started < time_slice:
+        query = queries[0].limit(PAGE_SIZE)
+        if fields:
+            query = query.select(fields)
+        page = list(query.stream())
+        scanned += len(page)
+        if page:
+            if ARCHIVE:
+                _archive(page)
+            deleted += _delete_chunks(db, [snap.reference for snap in page])
+        if len(page) < PAGE_SIZE:
+            # 이 조건의 만료 문서를 모두 삭제함
+            queries.pop(0)
+    complete = not queries
+
+    save_state(STATE_NAME, {
+        "updated_at": time.time(),
+        "last_run": {"scanned": scanned, "deleted": deleted, "complete": complete, "seconds": round(time.time() - started, 1)}
+    })
+    logger.info(f"🧹 Retention: scanned {scanned}, deleted {deleted}{' (all expired deleted)' if complete else ''}")
+    return {"scanned": scanned, "deleted": deleted, "complete": complete}
+
+def _run_safely(db, time_slice):
+    global _result
+    try:
+        _result = run(db, time_slice)
+    except Exception as e:
+        logger.error(f"Retention job failed: {e}")
+        _result = {"error": str(e)}
+
+def start(db, time_slice=TIME_SLICE):
+    """백그라운드 스레드로 정리 시작 (Mock DB이거나 비활성화 시 무시)"""
+    global _thread
+    if RETENTION_DAYS <= 0 or "MockDB" in str(type(db)):
+        return
+    _thread = threading.Thread(target=_run_safely, args=(db, time_slice), daemon=True)
+    _thread.start()
+
+def join(timeout=None):
+    """백그라운드 정리 종료 대기, 결과 반환"""
+    if _thread is not None:
+        _thread.join(timeout)
+    return _result
@@ -0,0 +1,47 @@
+"""
+실행 전체 시간 제한 (run deadline)
+워크플로는 15분마다 실행되므로, 느린 Gemini 응답이나 멈춘 피드 때문에 다음 실행과 겹치지 않도록
+각 단계가 남은 시간을 확인하고, 부족하면 새 작업을 시작하지 않고 다음 실행으로 넘김
+"""
+
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 실행당 총 시간 (초). cron 간격(15분)보다 여유 있게 설정
+RUN_BUDGET_SECONDS = int(os.environ.get('RUN_BUDGET_SECONDS', str(12 * 60)))
+
+# 마지막 저장(큐/상태/클러스터 문서)을 위해 항상 남겨 두는 시간
+FLUSH_RESERVE = 30
+
+class Deadline:
+    def __init__(self, seconds=RUN_BUDGET_SECONDS):
+        self.started = time.time()
+        self.ends = self.started + seconds
+        self.skipped = []
+
+    def elapsed(self):
+        return time.time() - self.started
+
+    def remaining(self):
+        """저장용 예약 시간을 뺀 남은 시간 (초)"""
+        return max(0.0, self.ends - time.time() - FLUSH_RESERVE)
+
+    def allows(self, needed, what=None):
+        """
+        needed초짜리 작업을 시작해도 되는지
+
+        what을 주면 거절 시 로그를 남기고 실행 보고서용 목록에 기록
+        """
+        if self.remaining() >= needed:
+            return True
+        if what:
+            self.skipped.append(what)
+            logger.warning(f"⏱️ Run deadline: {self.remaining():.0f}s left, skipping {what}")
+        return False
+
+    def timeout(self, cap):
+        """네트워크/LLM 호출 타임아웃: cap과 남은 시간 중 작은 값 (최소 1초)"""
+        return max(1.0, min(cap, self.remaining()))
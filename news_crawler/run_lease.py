@@ -0,0 +1,270 @@
+"""
+실행 중복 방지 (lease + 기사별 claim)
+실행이 15분을 넘기면 GitHub Actions가 다음 실행을 시작하므로, 두 실행이 같은 피드를 받아
+filter_new_articles에서 같은 기사를 "새 기사"로 보고 둘 다 Gemini 분석 비용을 냄
+
+- 샤드별 lease 문서(crawler_leases/news-shard-<i>)를 TTL과 함께 획득하고 백그라운드 heartbeat로 연장
+  프로세스가 죽으면 heartbeat가 멈추고 TTL 후 다음 실행이 lease를 가져감
+- lease를 얻지 못한 실행은 바로 종료 (LEASE_MODE=share 이면 계속 진행하되 claim되지 않은 기사만 처리)
+- 기사별 claim 표시(article_claims/<id>): 먼저 claim한 실행만 그 기사를 분석/저장
+  겹치는 실행이 같이 진행하는 share 모드에서만 사용 (exit 모드는 lease만으로 충분해 claim 문서를 쓰지 않음)
+  종료 시 이 실행의 claim을 모두 삭제 (처리한 기사는 이미 저장되어 있고, 이월 기사는 다음 실행이 다시 claim)
+  비정상 종료로 남은 claim은 expires_at 기준 Firestore TTL 정책으로 정리
+
+Firestore가 없으면 (MockDB) 같은 동작을 로컬 상태 파일(run_lease, article_claims)로 수행
+"""
+
+import os
+import time
+import uuid
+import socket
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pytz
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
+
+from crawler_state import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+LEASE_COLLECTION = "crawler_leases"
+CLAIM_COLLECTION = "article_claims"
+
+LEASE_TTL = 180              # heartbeat가 끊긴 lease는 3분 후 만료
+HEARTBEAT_SECONDS = 60
+CLAIM_TTL = 20 * 60          # 실행 시간 상한(워크플로 timeout)보다 길게
+
+# exit: lease가 있으면 종료 / share: claim되지 않은 기사만 처리
+LEASE_MODE = os.environ.get('LEASE_MODE', 'exit')
+
+def _owner_id():
+    run = os.environ.get('GITHUB_RUN_ID') or socket.gethostname()
+    return f"{run}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+class RunLease:
+    """
+    사용:
+        lease = RunLease(db, "news-shard-0")
+        if not lease.acquire(): ...            # 다른 실행이 진행 중
+        articles = lease.claim(articles)       # 이 실행이 처리할 기사만 남김 (share 모드)
+        lease.release_claims()                 # 이 실행의 claim 삭제
+        lease.release()
+    """
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.owner = _owner_id()
+        self.held = False
+        self.lost = False
+        self.is_mock = "MockDB" in str(type(db))
+        self._stop = threading.Event()
+        self._thread = None
+        self._local_lock = threading.Lock()
+        self._claimed = set()
+
+    # --- lease ---
+
+    def acquire(self):
+        """lease 획득 (성공 시 heartbeat 시작). 다른 실행이 유효한 lease를 갖고 있으면 False"""
+        try:
+            self.held = self._local_acquire() if self.is_mock else self._firestore_acquire()
+        except Exception as e:
+            # lease 저장소 장애로 수집 자체를 멈추지는 않음
+            logger.warning(f"Lease check failed, continuing without lease: {e}")
+            return True
+        if self.held:
+            self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+            self._thread.start()
+        return self.held
+
+    def holder(self):
+        """현재 lease 보유자 정보 (로그용)"""
+        try:
+            if self.is_mock:
+                return load_state("run_lease").get(self.name)
+            snap = self.db.collection(LEASE_COLLECTION).document(self.name).get()
+            return snap.to_dict() if snap.exists else None
+        except Exception:
+            return None
+
+    def _record(self, now):
+        return {"owner": self.owner, "heartbeat_at": now, "expires_at": now + LEASE_TTL}
+
+    def _local_acquire(self):
+        leases = load_state("run_lease")
+        current = leases.get(self.name)
+        now = time.time()
+        if current and current["owner"] != self.owner and current["expires_at"] > now:
+            return False
+        leases[self.name] = dict(self._record(now), acquired_at=now)
+        save_state("run_lease", leases)
+        return True
+
+    def _firestore_acquire(self):
+        ref = self.db.collection(LEASE_COLLECTION).document(self.name)
+
+        @firestore.transactional
+        def txn(transaction):
+            snap = ref.get(transaction=transaction)
+            current = snap.to_dict() if snap.exists else None
+            now = time.time()
+            if current and current.get("owner") != self.owner and current.get("expires_at", 0) > now:
+                return False
+            transaction.set(ref, dict(self._record(now), acquired_at=now))
+            return True
+
+        return txn(self.db.transaction())
+
+    def _extend(self):
+        """heartbeat: 아직 보유 중이면 만료 시각 연장, 다른 실행이 가져갔으면 False"""
+        now = time.time()
+        if self.is_mock:
+            with self._local_lock:
+                leases = load_state("run_lease")
+                current = leases.get(self.name)
+                if current and current["owner"] != self.owner:
+                    return False
+                leases[self.name] = dict(current or {}, **self._record(now))
+                save_state("run_lease", leases)
+                return True
+
+        ref = self.db.collection(LEASE_COLLECTION).document(self.name)
+
+        @firestore.transactional
+        def txn(transaction):
+            snap = ref.get(transaction=transaction)
+            if snap.exists and snap.to_dict().get("owner") != self.owner:
+                return False
+            transaction.set(ref, self._record(now), merge=True)
+            return True
+
+        return txn(self.db.transaction())
+
+    def _heartbeat(self):
+        while not self._stop.wait(HEARTBEAT_SECONDS):
+            try:
+                if not self._extend():
+                    self.lost = True
+                    logger.warning(f"🔒 Lease {self.name} was taken over by another run")
+                    return
+            except Exception as e:
+                logger.warning(f"Lease heartbeat failed: {e}")
+
+    def release(self):
+        """heartbeat 중지 후 lease 삭제 (보유 중일 때만)"""
+        self._stop.set()
+        if not self.held or self.lost:
+            return
+        try:
+            if self.is_mock:
+                with self._local_lock:
+                    leases = load_state("run_lease")
+                    if leases.get(self.name, {}).get("owner") == self.owner:
+                        leases.pop(self.name)
+                        save_state("run_lease", leases)
+            else:
+                ref = self.db.collection(LEASE_COLLECTION).document(self.name)
+                snap = ref.get()
+                if snap.exists and snap.to_dict().get("owner") == self.owner:
+                    ref.delete()
+        except Exception as e:
+            logger.warning(f"Lease release failed (expires in {LEASE_TTL}s): {e}")
+        self.held = False
+
+    # --- 기사별 claim ---
+
+    def claim(self, articles):
+        """
+        기사별 claim 표시를 남기고 이 실행이 claim한 기사만 반환
+
+        다른 실행이 claim했고 아직 만료되지 않은 기사는 제외
+        exit 모드에서는 겹치는 실행이 바로 종료하므로 claim 없이 그대로 반환
+        """
+        if not articles or LEASE_MODE != "share":
+            return articles or []
+        try:
+            if self.is_mock:
+                won = self._local_claim([a['id'] for a in articles])
+            else:
+                ids = [a['id'] for a in articles]
+                with ThreadPoolExecutor(max_workers=8) as pool:
+                    won = {aid for aid, ok in zip(ids, pool.map(self._firestore_claim, ids)) if ok}
+        except Exception as e:
+            logger.warning(f"Article claim failed, processing all articles: {e}")
+            return articles
+        self._claimed |= won
+        claimed = [a for a in articles if a['id'] in won]
+        if len(claimed) < len(articles):
+            logger.info(f"🔒 {len(articles) - len(claimed)} articles already claimed by another run")
+        return claimed
+
+    def _local_claim(self, ids):
+        with self._local_lock:
+            claims = load_state("article_claims")
+            now = time.time()
+            claims = {k: v for k, v in claims.items() if v["expires_at"] > now}
+            won = set()
+            for aid in ids:
+                current = claims.get(aid)
+                if current and current["owner"] != self.owner:
+                    continue
+                claims[aid] = {"owner": self.owner, "expires_at": now + CLAIM_TTL}
+                won.add(aid)
+            save_state("article_claims", claims)
+            return won
+
+    def _firestore_claim(self, aid):
+        ref = self.db.collection(CLAIM_COLLECTION).document(aid)
+        now = time.time()
+        # expires_at은 Firestore TTL 정책용 timestamp (만료 claim 문서 자동 삭제)
+        record = {
+            "owner": self.owner,
+            "claimed_at": now,
+            "expires_at": datetime.fromtimestamp(now + CLAIM_TTL, pytz.utc)
+        }
+        try:
+            ref.create(record)
+            return True
+        except AlreadyExists:
+            pass
+
+        @firestore.transactional
+        def takeover(transaction):
+            snap = ref.get(transaction=transaction)
+            current = snap.to_dict() if snap.exists else None
+            if current and current.get("owner") != self.owner and current["expires_at"].timestamp() > time.time():
+                return False
+            transaction.set(ref, record)
+            return True
+
+        return takeover(self.db.transaction())
+
+    def release_claims(self):
+        """이 실행이 claim한 기사의 claim 삭제 (처리한 기사와 다음 실행으로 넘기는 기사 모두)"""
+        ids = sorted(self._claimed)
+        if not ids:
+            return
+        try:
+            if self.is_mock:
+                with self._local_lock:
+                    claims = load_state("article_claims")
+                    for aid in ids:
+                        if claims.get(aid, {}).get("owner") == self.owner:
+                            claims.pop(aid)
+                    save_state("article_claims", claims)
+            else:
+                batch = self.db.batch()
+                for i, aid in enumerate(ids, 1):
+                    batch.delete(self.db.collection(CLAIM_COLLECTION).document(aid))
+                    if i % 400 == 0:
+                        batch.commit()
+                        batch = self.db.batch()
+                batch.commit()
+            self._claimed.clear()
+        except Exception as e:
+            logger.warning(f"Releasing article claims failed (they expire in {CLAIM_TTL // 60} min): {e}")
@@ -0,0 +1,69 @@
+"""
+피드 소스 샤딩 (consistent hashing)
+소스 이름을 해시 링에 배치해 N개의 워커(GitHub Actions matrix 또는 로컬 프로세스)가 나눠 수집
+워커 수가 바뀌어도 대부분의 소스는 같은 워커에 남으므로 워커가 가진 소스별 상태(high-water mark 등)가 유지됨
+
+환경변수:
+    SHARD_INDEX: 이 워커의 번호 (0부터)
+    SHARD_COUNT: 전체 워커 수 (기본 1 = 샤딩 없음)
+
+로컬 병렬 실행:
+    python sharding.py 4   # main.py를 4개 프로세스로 실행
+"""
+
+import os
+import sys
+import bisect
+import hashlib
+import subprocess
+
+SHARD_INDEX = int(os.environ.get('SHARD_INDEX', '0'))
+SHARD_COUNT = max(1, int(os.environ.get('SHARD_COUNT', '1')))
+
+# 워커당 가상 노드 수 (많을수록 분배가 고름)
+VNODES = 128
+
+def _hash(key):
+    return int(hashlib.md5(key.encode()).hexdigest()[:16], 16)
+
+def build_ring(shard_count, vnodes=VNODES):
+    """[(해시값, 샤드 번호)] 정렬 목록"""
+    return sorted((_hash(f"shard-{i}#{v}"), i) for i in range(shard_count) for v in range(vnodes))
+
+def shard_for(name, ring):
+    """소스 이름 -> 담당 샤드 번호 (링에서 시계 방향으로 첫 번째 노드)"""
+    points = [p for p, _ in ring]
+    idx = bisect.bisect(points, _hash(name)) % len(ring)
+    return ring[idx][1]
+
+def select_feeds(feeds, shard_index=None, shard_count=None):
+    """
+    이 워커가 담당하는 피드만 반환
+
+    Args:
+        feeds: {source_name: url}
+        shard_index, shard_count: 기본값은 환경변수 설정
+    """
+    shard_index = SHARD_INDEX if shard_index is None else shard_index
+    shard_count = SHARD_COUNT if shard_count is None else shard_count
+    if shard_count <= 1:
+        return dict(feeds)
+    ring = build_ring(shard_count)
+    return {name: url for name, url in feeds.items() if shard_for(name, ring) == shard_index}
+
+def worker_label():
+    """워커 전용 상태 디렉토리 이름 (샤딩 없으면 None). 워커 수(SHARD_COUNT)는 넣지 않음"""
+    return f"worker-{SHARD_INDEX}" if SHARD_COUNT > 1 else None
+
+def main():
+    """main.py를 N개 로컬 프로세스로 병렬 실행"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    procs = []
+    for i in range(count):
+        env = {**os.environ, 'SHARD_INDEX': str(i), 'SHARD_COUNT': str(count)}
+        procs.append(subprocess.Popen([sys.executable, script], env=env))
+    sys.exit(max(p.wait() for p in procs))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+스토리 클러스터링 (같은 사건 기사 묶기)
+연준 결정/대형 실적 발표처럼 한 사건에 여러 피드의 기사가 몰리면 기사마다 번역·요약·인사이트를 만들 필요가 없음
+제목+description 해싱 벡터의 코사인 유사도로 시간 창 안의 기사를 온라인 클러스터링하고
+클러스터당 대표 기사 1건만 LLM으로 분석, 나머지 기사는 그 분석을 공유하며 클러스터 문서를 참조
+
+클러스터 상태(중심 벡터, 멤버, 분석 결과)는 Firestore story_clusters 컬렉션에 저장되어
+다른 샤드(다른 피드)나 다음 실행에서 같은 사건 기사가 들어오면 LLM 호출 없이 기존 분석을 재사용
+- 시작 시 WINDOW_HOURS 안에 생성된 클러스터 문서만 조회 (first_seen_at 단일 필드 인덱스)
+- 저장 시 멤버/소스는 ArrayUnion, 기사 수는 Increment로 병합 (동시에 실행되는 샤드끼리 덮어쓰지 않음)
+- Firestore가 없으면 (MockDB) 로컬 상태(story_clusters)를 사용
+- 클러스터는 생성 후 WINDOW_HOURS 동안만 열림 (기사가 계속 합류해도 창이 늘어나지 않음)
+- 이월되어 다시 들어온 기사는 멤버로 중복 추가하지 않음
+- 공유하는 것은 분석(intelligence)뿐이며 제목/본문은 기사마다 자신의 것을 사용
+"""
+
+import re
+import time
+import zlib
+import logging
+from datetime import datetime
+
+import numpy as np
+import pytz
+from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from crawler_state import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "story_clusters"
+COLLECTION_NAME = "story_clusters"
+
+N_FEATURES = 2 ** 12
+SIMILARITY_THRESHOLD = 0.45
+WINDOW_HOURS = 12
+CENTROID_TERMS = 64      # 저장 시 중심 벡터는 가중치 상위 항만 유지
+MAX_MEMBERS_STORED = 50
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = {
+    "the", "a", "an", "of", "to", "in", "on", "for", "and", "or", "is", "are", "as", "at", "by",
+    "with", "from", "after", "its", "it", "this", "that", "be", "will", "says", "said", "new",
+    "inc", "co", "corp", "ltd", "news", "reuters", "cnbc", "wsj", "marketwatch"
+}
+
+def _vectorize(texts):
+    """텍스트 목록 -> L2 정규화된 해싱 단어 벡터 (n, N_FEATURES)"""
+    x = np.zeros((len(texts), N_FEATURES), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for tok in _TOKEN_RE.findall(text.lower()):
+            if tok in STOPWORDS or len(tok) < 2:
+                continue
+            x[i, zlib.crc32(tok.encode()) % N_FEATURES] += 1.0
+    x = np.log1p(x)
+    return x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-9)
+
+def _article_text(art):
+    return f"{art.get('title', '')} {art.get('full_content', '')[:300]}"
+
+def _sparse(vec):
+    idx = np.argsort(vec)[-CENTROID_TERMS:]
+    return {str(int(i)): float(vec[i]) for i in idx if vec[i] > 0}
+
+def _dense(sparse):
+    vec = np.zeros(N_FEATURES, dtype=np.float32)
+    for i, v in sparse.items():
+        vec[int(i)] = v
+    return vec
+
+class StoryClusters:
+    """
+    사용:
+        clusters = StoryClusters.load(db)
+        reps, followers = clusters.assign(articles)   # reps만 LLM 분석
+        clusters.set_analysis(rep['cluster_id'], ai_data)
+        clusters.analysis_for(follower)               # 대표 분석 공유
+        clusters.save(db)
+    """
+
+    def __init__(self, clusters):
+        self.clusters = clusters
+        self.touched = set()
+        self.added = {}        # 클러스터별 이번 실행에서 합류한 기사 ID
+        self.analysed = set()  # 이번 실행에서 분석을 기록한 클러스터
+
+    @classmethod
+    def load(cls, db):
+        """WINDOW_HOURS 안에 생성된 클러스터 (모든 샤드 공유)"""
+        now = time.time()
+        if "MockDB" in str(type(db)):
+            clusters = {
+                cid: c for cid, c in load_state(STATE_NAME).items()
+                if now - c.get('created_at', 0) < WINDOW_HOURS * 3600
+            }
+            return cls(clusters)
+
+        since = datetime.fromtimestamp(now - WINDOW_HOURS * 3600, pytz.utc)
+        query = (db.collection(COLLECTION_NAME)
+                 .where(filter=FieldFilter("first_seen_at", ">=", since))
+                 .select(["title", "korean_title", "centroid", "member_ids", "sources", "article_count",
+                          "analysed", "intelligence", "first_seen_at"]))
+        clusters = {}
+        for snap in query.stream():
+            doc = snap.to_dict()
+            if not doc.get("centroid"):
+                continue
+            analysis = None
+            if doc.get("analysed"):
+                analysis = dict(doc.get("intelligence", {}), korean_title=doc.get("korean_title"))
+            clusters[snap.id] = {
+                "centroid": doc["centroid"],
+                "created_at": doc["first_seen_at"].timestamp(),
+                "updated_at": now,
+                "member_ids": doc.get("member_ids", []),
+                "sources": doc.get("sources", []),
+                "analysis": analysis,
+                "title": doc.get("title", ""),
+                "n": doc.get("article_count", 0)
+            }
+        logger.info(f"🧩 Story clusters: {len(clusters)} open clusters loaded")
+        return cls(clusters)
+
+    def assign(self, articles):
+        """
+        기사마다 cluster_id 지정 (기존 클러스터 합류 또는 새 클러스터 생성)
+
+        Returns:
+            (대표 기사 목록 - LLM 분석 대상, 나머지 기사 목록 - 대표 분석 공유)
+        """
+        if not articles:
+            return [], []
+        vectors = _vectorize([_article_text(a) for a in articles])
+        ids = list(self.clusters)
+        pos = {cid: i for i, cid in enumerate(ids)}
+        centroids = np.array([_dense(self.clusters[cid]['centroid']) for cid in ids], dtype=np.float32).reshape(len(ids), N_FEATURES)
+        members = {mid: cid for cid, c in self.clusters.items() for mid in c['member_ids']}
+        has_rep = set()
+        reps, followers = [], []
+        now = time.time()
+
+        for art, vec in zip(articles, vectors):
+            # 이월/보류되어 다시 들어온 기사: 기존 클러스터 유지 (중심 벡터/멤버 수 갱신 안 함)
+            cid = members.get(art['id'])
+            if cid is not None:
+                art['cluster_id'] = cid
+                if self.clusters[cid].get('analysis') or cid in has_rep:
+                    followers.append(art)
+                else:
+                    has_rep.add(cid)
+                    reps.append(art)
+                continue
+
+            cid = None
+            if ids:
+                sims = centroids @ vec
+                best = int(np.argmax(sims))
+                if sims[best] >= SIMILARITY_THRESHOLD:
+                    cid = ids[best]
+            if cid is None:
+                cid = f"c_{art['id'][:16]}"
+                self.clusters[cid] = {
+                    "centroid": {}, "created_at": now, "updated_at": now,
+                    "member_ids": [], "sources": [], "analysis": None, "title": art['title'], "n": 0
+                }
+                pos[cid] = len(ids)
+                ids.append(cid)
+                centroids = np.vstack([centroids, np.zeros((1, N_FEATURES), dtype=np.float32)])
+
+            # 중심 벡터 = 멤버 벡터의 누적 평균 (정규화)
+            c = self.clusters[cid]
+            idx = pos[cid]
+            centroid = (centroids[idx] * c['n'] + vec) / (c['n'] + 1)
+            centroid /= max(np.linalg.norm(centroid), 1e-9)
+            centroids[idx] = centroid
+            c['centroid'] = _sparse(centroid)
+            c['n'] += 1
+            c['updated_at'] = now
+            c['member_ids'] = (c['member_ids'] + [art['id']])[-MAX_MEMBERS_STORED:]
+            members[art['id']] = cid
+            self.added.setdefault(cid, []).append(art['id'])
+            if art['source'] not in c['sources']:
+                c['sources'].append(art['source'])
+            self.touched.add(cid)
+
+            art['cluster_id'] = cid
+            if c.get('analysis') or cid in has_rep:
+                followers.append(art)
+            else:
+                has_rep.add(cid)
+                reps.append(art)
+
+        if followers:
+            logger.info(f"🧩 Story clustering: {len(reps)} stories to analyse, {len(followers)} articles share an analysis")
+        return reps, followers
+
+    def set_analysis(self, cluster_id, ai_data):
+        if cluster_id in self.clusters and ai_data:
+            self.clusters[cluster_id]['analysis'] = {k: v for k, v in ai_data.items() if k != 'item_index'}
+            self.touched.add(cluster_id)
+            self.analysed.add(cluster_id)
+
+    def analysis_for(self, art):
+        c = self.clusters.get(art.get('cluster_id'))
+        return c.get('analysis') if c else None
+
+    def save(self, db):
+        """이번 실행에서 바뀐 클러스터 문서 갱신 (MockDB면 로컬 상태 저장)"""
+        if "MockDB" in str(type(db)):
+            save_state(STATE_NAME, self.clusters)
+            for cid in self.touched:
+                c = self.clusters[cid]
+                title = (c.get('analysis') or {}).get('korean_title', c['title'])
+                print(f"[🧩 CLUSTER] {title} ({len(c['sources'])} sources, {c['n']} articles)")
+            self.touched.clear()
+            return
+        if not self.touched:
+            return
+
+        batch = db.batch()
+        for cid in self.touched:
+            c = self.clusters[cid]
+            doc = {
+                "id": cid,
+                "title": c['title'],
+                "centroid": c['centroid'],
+                "sources": firestore.ArrayUnion(c['sources']),
+                "first_seen_at": datetime.fromtimestamp(c['created_at'], pytz.utc),
+                "updated_at": firestore.SERVER_TIMESTAMP
+            }
+            added = self.added.get(cid, [])
+            if added:
+                doc["member_ids"] = firestore.ArrayUnion(added)
+                doc["article_count"] = firestore.Increment(len(added))
+            # 다른 샤드가 기록한 분석을 빈 값으로 덮어쓰지 않도록 이번 실행에서 분석한 경우만 기록
+            if cid in self.analysed:
+                analysis = c['analysis']
+                doc.update({
+                    "analysed": True,
+                    "korean_title": analysis.get('korean_title', c['title']),
+                    "intelligence": {
+                        "impact_score": analysis.get('impact_score', 5),
+                        "market_sentiment": analysis.get('market_sentiment', 'NEUTRAL'),
+                        "actionable_insight": analysis.get('actionable_insight', ''),
+                        "related_assets": analysis.get('related_assets', [])
+                    }
+                })
+            batch.set(db.collection(COLLECTION_NAME).document(cid), doc, merge=True)
+        batch.commit()
+        self.touched.clear()
+        self.added.clear()
+        self.analysed.clear()
@@ -9,6 +9,8 @@ import feedparser
 import requests
 from datetime import datetime
 import time
+import http_cache
+from feed_benchmark import print_table, run_benchmark
 
 # 현재 프로젝트에서 사용 중인 RSS Feeds
 CURRENT_RSS_FEEDS = {
@@ -42,7 +44,8 @@ def test_rss_feed(name, url, timeout=10):
         print(f"  URL: {url}")
         
         start_time = time.time()
-        feed = feedparser.parse(url)
+        resp = http_cache.get(url, kind="rss", timeout=timeout)
+        feed = feedparser.parse(resp.content)
         elapsed = time.time() - start_time
         
         if feed.bozo:
@@ -53,7 +56,7 @@ def test_rss_feed(name, url, timeout=10):
             return False
         
         print(f"  [OK] Found {len(feed.entries)} articles")
-        print(f"  [OK] Response time: {elapsed:.2f}s")
+        print(f"  [OK] Response time: {elapsed:.2f}s" + (" (cached)" if resp.from_cache else ""))
         
         # 첫 번째 기사 샘플
         if feed.entries:
@@ -137,22 +140,19 @@ def main():
     print("현재 프로젝트 RSS Feeds 테스트")
     print("=" * 80)
     
-    current_results = {}
-    for name, url in CURRENT_RSS_FEEDS.items():
-        result = test_rss_feed(name, url)
-        current_results[name] = result
-        time.sleep(0.5)  # Rate limiting
+    # 모든 소스 동시 측정 (여러 라운드/JSON·CSV 보고서는 feed_benchmark.py)
+    results = run_benchmark(CURRENT_RSS_FEEDS, rounds=1)
+    print_table(results, [])
+    current_results = {r["source"]: r["success"] > 0 for r in results}
     
     # 3. 프리미엄 RSS 테스트
     print("\n" + "=" * 80)
     print("프리미엄 RSS Feeds 테스트 (NEWS_SOURCES.md)")
     print("=" * 80)
     
-    premium_results = {}
-    for name, url in PREMIUM_RSS_FEEDS.items():
-        result = test_rss_feed(name, url)
-        premium_results[name] = result
-        time.sleep(0.5)
+    results = run_benchmark(PREMIUM_RSS_FEEDS, rounds=1)
+    print_table(results, [])
+    premium_results = {r["source"]: r["success"] > 0 for r in results}
     
     # 4. 결과 요약
     print("\n" + "=" * 80)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+text_clean 테스트 (실제 피드 description 형태)
+실행: python -m pytest test_text_clean.py
+"""
+import text_clean
+from text_clean import clean_description, estimate_tokens, truncate_tokens
+
+def test_prose_mentioning_read_more_is_kept():
+    text = "Analysts read more into the Fed minutes, saying rates may stay high."
+    assert clean_description(text) == text
+
+def test_prose_mentioning_click_here_to_read_is_kept():
+    text = "Traders who click here to read the filings found nothing new in the 10-Q."
+    assert clean_description(text) == text
+
+def test_post_prefix_in_prose_is_kept():
+    text = "The post-pandemic recovery appeared first on the factory floor, economists said."
+    assert clean_description(text) == text
+
+def test_trailing_read_more_is_dropped():
+    assert clean_description("Stocks rose on Monday as chip makers rallied. Read more") == \
+        "Stocks rose on Monday as chip makers rallied."
+
+def test_continue_reading_line_is_dropped():
+    raw = "<p>Oil fell 2% after OPEC+ signalled higher output.</p><p>Continue reading...</p>"
+    assert clean_description(raw) == "Oil fell 2% after OPEC+ signalled higher output."
+
+def test_wordpress_post_footer_is_dropped():
+    raw = ("<p>Gold hit a record high on Tuesday as the dollar weakened.</p>"
+           "<p>The post Gold hits record as dollar slides appeared first on Kitco News.</p>")
+    assert clean_description(raw) == "Gold hit a record high on Tuesday as the dollar weakened."
+
+def test_ellipsis_marker_and_read_more_link_are_dropped():
+    raw = 'Markets slid as Treasury yields jumped to a 16-year high […] <a href="https://example.com/x">Read more »</a>'
+    assert clean_description(raw) == "Markets slid as Treasury yields jumped to a 16-year high"
+
+def test_korean_copyright_footer_is_dropped():
+    raw = "코스피가 외국인 매수에 2% 상승했다.<br/>무단 전재 및 재배포 금지"
+    assert clean_description(raw) == "코스피가 외국인 매수에 2% 상승했다."
+
+def test_google_news_headline_and_source_are_dropped():
+    raw = ('<a href="https://news.google.com/rss/articles/CBMiK2h0dHBz?oc=5" target="_blank">Fed cuts rates by a quarter point</a>'
+           '&nbsp;&nbsp;<font color="#6f6f6f">Reuters</font>')
+    assert clean_description(raw, "Fed cuts rates by a quarter point - Reuters") == ""
+
+def test_google_news_korean_headline_and_source_are_dropped():
+    raw = ('<a href="https://news.google.com/rss/articles/CBMiK2h0dHBz?oc=5" target="_blank">한은, 기준금리 3.25%로 동결</a>'
+           '&nbsp;&nbsp;<font color="#6f6f6f">연합뉴스</font>')
+    assert clean_description(raw, "한은, 기준금리 3.25%로 동결 - 연합뉴스") == ""
+
+def test_title_repeat_keeps_following_text():
+    raw = "Fed cuts rates by a quarter point - Policymakers signalled two more cuts this year."
+    assert clean_description(raw, "Fed cuts rates by a quarter point - Reuters") == \
+        "Policymakers signalled two more cuts this year."
+
+def test_hyphenated_title_without_source_suffix_is_matched_whole():
+    raw = "Oil rises - then falls - as OPEC+ meets Traders await output quotas."
+    assert clean_description(raw, "Oil rises - then falls - as OPEC+ meets") == "Traders await output quotas."
+
+def test_entities_and_scripts_are_cleaned():
+    raw = "<script>track()</script><p>S&amp;amp;P 500 &nbsp;closes higher</p>"
+    assert clean_description(raw) == "S&P 500 closes higher"
+
+def test_truncates_at_sentence_within_budget():
+    raw = "The Fed held rates. " * 40
+    text = clean_description(raw, "", 30)
+    assert estimate_tokens(text) <= 30
+    assert text.endswith(".")
+
+def test_truncate_without_sentence_end_adds_ellipsis():
+    text = truncate_tokens("word " * 100, 10)
+    assert text.endswith(text_clean.ELLIPSIS)
+    assert estimate_tokens(text) <= 11
@@ -0,0 +1,129 @@
+"""
+RSS description 정리 (HTML -> 텍스트, 토큰 예산 기준 자르기)
+Google News와 여러 매체의 description은 링크/추적용 마크업이 섞인 HTML 조각이라
+fallback 본문(korean_body)에 그대로 들어가고, LLM 프롬프트에 넣으면 토큰만 늘어남
+
+- 정규식 기반 경량 처리 (BeautifulSoup보다 빠름, 짧은 조각 전용)
+- 태그 제거, HTML 엔티티 복원, 공백 정리
+- 상용구 제거 ("The post ... appeared first on ...", "Read more" 등), 제목 반복 제거
+- 토큰 예산에 맞춰 문장/단어 경계에서 자르기
+- 같은 입력은 메모 캐시(lru_cache)로 재사용 (이월 기사, 프롬프트/저장 양쪽에서 호출)
+"""
+
+import re
+import html
+from functools import lru_cache
+
+# 토큰 추정: ASCII는 문자 4개 ≈ 1토큰, 한글 등 비ASCII는 문자 1.5개 ≈ 1토큰
+ASCII_CHARS_PER_TOKEN = 4
+OTHER_CHARS_PER_TOKEN = 1.5
+
+MEMO_SIZE = 4096
+ELLIPSIS = "…"
+
+_BLOCK_RE = re.compile(r"<(script|style|noscript|iframe)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_BREAK_RE = re.compile(r"<\s*(br|/p|/div|/li|/h[1-6]|/tr)\b[^>]*>", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_SPACE_RE = re.compile(r"[ \t\r\f\v\u00a0\u200b]+")
+_NEWLINES_RE = re.compile(r"\s*\n\s*")
+_SENTENCE_END_RE = re.compile(r"[.!?。](?=\s)")
+# Google News 제목 끝의 " - 매체명"
+_SOURCE_SUFFIX_RE = re.compile(r"\s+[-–—|]\s+([^-–—|]{1,60})$")
+
+# 상용구는 줄 맨 앞이나 문장 끝 뒤에 붙은 마지막 구절일 때만 제거 (본문 문장 속 "read more" 등은 유지)
+_CLAUSE_START = r"(?:^|(?<=[.!?…\]])[ ]?)"
+BOILERPLATE_PATTERNS = [
+    re.compile(_CLAUSE_START + r"The post [^\n]{0,300}? appeared first on [^\n]{0,120}?(\.|$)", re.IGNORECASE | re.MULTILINE),
+    re.compile(_CLAUSE_START + r"(Continue reading|Read more|Read the full (story|article)|Click here to read|View Full Coverage on Google News)\b[^\n]{0,80}$",
+               re.IGNORECASE | re.MULTILINE),
+    re.compile(r"\[(…|\.\.\.)\]"),
+    re.compile(_CLAUSE_START + r"[<(\[]?(저작권자[^\n]{0,40})?(기사 ?원문 ?보기|무단 ?전재 ?및 ?재배포 ?금지)[^\n]{0,40}$", re.MULTILINE),
+]
+
+def estimate_tokens(text):
+    """text의 토큰 수 추정"""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ch < "\x80")
+    return int(ascii_chars / ASCII_CHARS_PER_TOKEN + (len(text) - ascii_chars) / OTHER_CHARS_PER_TOKEN + 0.5)
+
+def strip_html(fragment):
+    """HTML 조각 -> 텍스트 (문단 구분은 줄바꿈으로 유지)"""
+    text = fragment
+    if "<" in text:
+        text = _COMMENT_RE.sub(" ", text)
+        text = _BLOCK_RE.sub(" ", text)
+        text = _BREAK_RE.sub("\n", text)
+        text = _TAG_RE.sub(" ", text)
+    if "&" in text:
+        # 이중 인코딩(&amp;nbsp;)까지 복원
+        text = html.unescape(html.unescape(text))
+    text = _SPACE_RE.sub(" ", text)
+    return _NEWLINES_RE.sub("\n", text).strip()
+
+def _drop_boilerplate(text, title):
+    for pattern in BOILERPLATE_PATTERNS:
+        text = pattern.sub("", text)
+    if title:
+        # Google News는 제목이 "헤드라인 - 매체명", description이 "헤드라인 매체명"뿐인 경우가 많음
+        norm_title = _SPACE_RE.sub(" ", strip_html(title)).strip()
+        suffix = _SOURCE_SUFFIX_RE.search(norm_title)
+        source = suffix.group(1).strip() if suffix else ""
+        for prefix in (norm_title, norm_title[:suffix.start()] if suffix else ""):
+            if prefix and text.startswith(prefix):
+                text = text[len(prefix):].lstrip(" -–—|:")
+                break
+        if source and text.strip() == source:
+            text = ""
+    return text.strip()
+
+def truncate_tokens(text, max_tokens):
+    """
+    토큰 예산(max_tokens)에 맞게 자르기
+
+    가능하면 마지막 문장 끝에서, 아니면 단어 경계에서 자르고 "…" 추가
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 예산에 맞는 최대 길이를 이진 탐색
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    ends = list(_SENTENCE_END_RE.finditer(cut))
+    if ends and ends[-1].end() >= len(cut) * 0.6:
+        return cut[:ends[-1].end()]
+    space = cut.rfind(" ")
+    if space >= len(cut) * 0.6:
+        cut = cut[:space]
+    return cut.rstrip(" ,;:-") + ELLIPSIS
+
+@lru_cache(maxsize=MEMO_SIZE)
+def clean_description(raw, title="", max_tokens=0):
+    """
+    RSS description 정리
+
+    Args:
+        raw: description 원문 (HTML 조각 또는 텍스트)
+        title: 기사 제목 (description 앞부분의 제목 반복 제거용)
+        max_tokens: 토큰 예산 (0이면 자르지 않음)
+
+    Returns:
+        정리된 텍스트
+    """
+    if not raw:
+        return ""
+    text = _drop_boilerplate(strip_html(raw), title)
+    return truncate_tokens(text, max_tokens) if max_tokens else text
+
+@lru_cache(maxsize=MEMO_SIZE)
+def compact(text, max_tokens):
+    """이미 정리된 텍스트를 토큰 예산에 맞게 자르기 (메모 캐시)"""
+    return truncate_tokens(text, max_tokens)
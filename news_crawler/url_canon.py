@@ -0,0 +1,110 @@
+"""
+기사 URL 정규화 (기사 ID 생성용)
+같은 기사라도 추적 파라미터(utm_*, mod= 등), AMP/모바일 변형, 끝 슬래시, http/https 차이로
+원본 링크가 달라지므로, 정규화된 형태로 ID를 만들어 중복 분석/저장을 방지
+
+정규화 결과는 ID 계산 전용 (실제 요청에 쓰는 링크는 원래 URL 유지)
+"""
+
+import re
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# 모든 도메인 공통 추적 파라미터
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ocid", "cmpid",
+    "mod", "ref", "ref_src", "refsrc", "src", "source", "feed", "rss",
+    "siteid", "yptr", "taid", "guccounter", "guce_referrer", "guce_referrer_sig",
+    "outputtype", "amp", "__source", "tpcc", "traffic_source", "smid", "partner"
+}
+TRACKING_PREFIXES = ("utm_", "at_", "itm_")
+
+# 도메인별 규칙
+#   drop_query: 기사 식별에 쿼리가 필요 없는 사이트 -> 쿼리 전체 제거
+#   path_rules: (정규식, 치환) 목록. AMP/RSS 전용 경로 변형을 일반 기사 경로로 통일
+DOMAIN_RULES = {
+    "wsj.com": {
+        "drop_query": True,
+        "path_rules": [(r"^/amp/", "/")]
+    },
+    "cnbc.com": {
+        "drop_query": True,
+        "path_rules": [(r"^/amp/", "/")]
+    },
+    "marketwatch.com": {
+        "drop_query": True,
+        "path_rules": [(r"^/amp/", "/"), (r"\.mrss$", "")]
+    },
+    "coindesk.com": {
+        "drop_query": True,
+        "path_rules": [(r"/amp$", "")]
+    },
+    "techcrunch.com": {
+        "drop_query": True,
+        "path_rules": [(r"/amp$", "")]
+    },
+    "investing.com": {
+        "drop_query": True,
+        "path_rules": [(r"^/amp/", "/")]
+    },
+}
+
+# 식별에 의미 없는 호스트 접두어 (언어판 kr./jp. 등은 다른 기사이므로 유지)
+HOST_PREFIXES = ("www.", "m.", "amp.", "mobile.")
+
+def _rules_for(host):
+    for domain, rules in DOMAIN_RULES.items():
+        if host == domain or host.endswith("." + domain):
+            return rules
+    return None
+
+def canonicalize_url(url):
+    """
+    URL -> 기사 식별용 정규 형태
+
+    - scheme은 https로 통일, 호스트 소문자 + www./m./amp. 제거, 기본 포트/fragment 제거
+    - 추적 파라미터 제거, 나머지 쿼리는 정렬
+    - 도메인별 규칙 적용 (쿼리 전체 제거, AMP 경로 통일)
+    - 끝 슬래시, /amp, .amp.html 변형 제거
+    """
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    path = re.sub(r"\.amp\.html$", ".html", path)
+    path = re.sub(r"/amp/?$", "", path)
+
+    rules = _rules_for(host)
+    if rules:
+        for pattern, repl in rules.get("path_rules", []):
+            path = re.sub(pattern, repl, path)
+
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    if rules and rules.get("drop_query"):
+        query = ""
+    else:
+        params = [
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+        ]
+        query = urlencode(sorted(params))
+
+    return urlunsplit(("https", host, path or "/", query, ""))
+
+def article_id(url):
+    """정규화된 URL 기준 기사 ID (investment_insights 문서 ID)"""
+    return hashlib.md5(canonicalize_url(url).encode()).hexdigest()
+
+def legacy_id(url):
+    """정규화 도입 이전 방식의 ID (원본 링크 md5). 기존 문서와의 중복 확인용"""
+    return hashlib.md5(url.encode()).hexdigest()